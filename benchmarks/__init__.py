@@ -0,0 +1,5 @@
+"""
+Offline benchmarks for LSAP capabilities.
+
+Run with `python -m benchmarks --help` (or `just bench`).
+"""
@@ -0,0 +1,85 @@
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import anyio
+
+from .fake import LatencyModel
+from .suite import (
+    SCENARIOS,
+    BenchConfig,
+    compare_results,
+    dump_results,
+    format_results,
+    run_suite,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Run the LSAP capabilities against a simulated language server.",
+    )
+    parser.add_argument(
+        "scenarios", nargs="*", metavar="SCENARIO", help=", ".join(SCENARIOS)
+    )
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--symbols", type=int, default=20, help="per file")
+    parser.add_argument("--references", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="median")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--server-workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--cold", action="store_true", help="fresh client (empty caches) per request"
+    )
+    parser.add_argument(
+        "--memory", action="store_true", help="record peak memory (slower)"
+    )
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, help="results file to compare with")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative regression against --baseline",
+    )
+    args = parser.parse_args()
+    if unknown := set(args.scenarios) - SCENARIOS.keys():
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    config = BenchConfig(
+        files=args.files,
+        symbols=args.symbols,
+        references=args.references,
+        iterations=args.iterations,
+        concurrency=args.concurrency,
+        latency=LatencyModel(
+            median_ms=args.latency_ms, sigma=args.latency_sigma, seed=args.seed
+        ),
+        server_workers=args.server_workers,
+        cold=args.cold,
+        trace_memory=args.memory,
+    )
+
+    with tempfile.TemporaryDirectory(prefix="lsap-bench-") as root:
+        results = anyio.run(run_suite, Path(root), config, args.scenarios)
+
+    print(format_results(results))
+    if args.json:
+        args.json.write_text(dump_results(results, config))
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if regressions := compare_results(results, baseline, args.tolerance):
+            print("\nRegressions:", *regressions, sep="\n  ", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,391 @@
+"""
+In-process fake language server used by the benchmark suite.
+
+`FakeClient` answers LSP requests at the `request()` level, so the real
+`lsp_client` capability mixins (including their multi-request flows such as call
+hierarchy prepare + incoming calls) run unchanged. Every request is counted and
+delayed by a sample of the configured latency distribution.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import random
+import time
+from collections import Counter
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+import anyio
+import lsprotocol.types as lsp_type
+from attrs import Factory, define, field, frozen
+from lsp_client.capability.request import (
+    WithRequestCallHierarchy,
+    WithRequestDefinition,
+    WithRequestDocumentSymbol,
+    WithRequestHover,
+    WithRequestReferences,
+    WithRequestRename,
+    WithRequestWorkspaceSymbol,
+)
+from lsp_client.client.document_state import DocumentStateManager
+from lsp_client.protocol import CapabilityClientProtocol
+from lsp_client.protocol.lang import LanguageConfig
+from lsp_client.utils.config import ConfigurationMap
+from lsp_client.utils.types import AnyPath
+
+TARGET = "target"
+"""Name of the symbol every synthetic reference points to."""
+
+LINES_PER_SYMBOL = 4
+
+
+@define
+class LatencyModel:
+    """Log-normal per-request latency, parameterised by its median."""
+
+    median_ms: float = 5.0
+    sigma: float = 0.5
+    seed: int = 0
+
+    _rng: random.Random = field(init=False, factory=random.Random, repr=False)
+
+    def __attrs_post_init__(self) -> None:
+        self._rng.seed(self.seed)
+
+    def sample(self) -> float:
+        """One latency sample, in seconds."""
+        if self.median_ms <= 0:
+            return 0.0
+        return self._rng.lognormvariate(math.log(self.median_ms / 1000), self.sigma)
+
+
+@frozen
+class SyntheticSymbol:
+    name: str
+    kind: lsp_type.SymbolKind
+    file: Path
+    line: int
+    children: tuple[SyntheticSymbol, ...] = ()
+
+    @property
+    def range(self) -> lsp_type.Range:
+        return lsp_type.Range(
+            start=lsp_type.Position(line=self.line, character=0),
+            end=lsp_type.Position(line=self.line + LINES_PER_SYMBOL - 1, character=0),
+        )
+
+
+@define
+class SyntheticWorkspace:
+    """
+    A generated Python project: `files` modules spread over sub-packages, each
+    with `symbols` top-level definitions, and `references` call sites of
+    `target` (defined first in the first module).
+    """
+
+    root: Path
+    files: int
+    symbols: int
+    references: int
+
+    paths: list[Path] = Factory(list)
+    outlines: dict[Path, list[SyntheticSymbol]] = Factory(dict)
+    reference_sites: list[lsp_type.Location] = Factory(list)
+    target_location: lsp_type.Location | None = None
+
+    @classmethod
+    def generate(
+        cls,
+        root: Path,
+        *,
+        files: int = 50,
+        symbols: int = 20,
+        references: int = 200,
+        per_package: int = 20,
+    ) -> SyntheticWorkspace:
+        ws = cls(root=root, files=files, symbols=max(symbols, 2), references=0)
+        slots = [(f, s) for s in range(1, ws.symbols) for f in range(files)]
+        with_ref = set(slots[:references])
+        ws.references = len(with_ref)
+
+        # Age every file so the content/symbol caches are allowed to engage.
+        mtime = time.time() - 60
+        for f in range(files):
+            path = root / f"pkg_{f // per_package}" / f"mod_{f}.py"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            lines, outline = ws._render(f, path, with_ref)
+            path.write_text("\n".join(lines) + "\n")
+            os.utime(path, (mtime, mtime))
+            ws.paths.append(path)
+            ws.outlines[path] = outline
+        return ws
+
+    def _render(
+        self, f: int, path: Path, with_ref: set[tuple[int, int]]
+    ) -> tuple[list[str], list[SyntheticSymbol]]:
+        lines: list[str] = []
+        outline: list[SyntheticSymbol] = []
+        uri = path.as_uri()
+        for s in range(self.symbols):
+            line = len(lines)
+            call = f"{TARGET}(arg)" if (f, s) in with_ref else "arg"
+            if f == 0 and s == 0:
+                lines += [f"def {TARGET}(arg):", "    return arg", "", ""]
+                sym = SyntheticSymbol(TARGET, lsp_type.SymbolKind.Function, path, line)
+                self.target_location = lsp_type.Location(
+                    uri=uri, range=_word_range(line, 4, TARGET)
+                )
+            elif s % 2:
+                lines += [
+                    f"class Widget{f}_{s}:",
+                    "    def run(self, arg):",
+                    f"        return {call}",
+                    "",
+                ]
+                method = SyntheticSymbol(
+                    "run", lsp_type.SymbolKind.Method, path, line + 1
+                )
+                sym = SyntheticSymbol(
+                    f"Widget{f}_{s}",
+                    lsp_type.SymbolKind.Class,
+                    path,
+                    line,
+                    (method,),
+                )
+            else:
+                lines += [
+                    f"def func{f}_{s}(arg):",
+                    f"    value = {call}",
+                    "    return value",
+                    "",
+                ]
+                sym = SyntheticSymbol(
+                    f"func{f}_{s}", lsp_type.SymbolKind.Function, path, line
+                )
+            outline.append(sym)
+            if (f, s) in with_ref:
+                ref_line = line + 2 if s % 2 else line + 1
+                col = lines[ref_line].index(TARGET)
+                self.reference_sites.append(
+                    lsp_type.Location(uri=uri, range=_word_range(ref_line, col, TARGET))
+                )
+        return lines, outline
+
+    def symbol_at(self, path: Path, line: int) -> SyntheticSymbol | None:
+        outline = self.outlines.get(path)
+        if not outline or not 0 <= (idx := line // LINES_PER_SYMBOL) < len(outline):
+            return None
+        sym = outline[idx]
+        for child in sym.children:
+            if child.line <= line:
+                return child
+        return sym
+
+
+def _word_range(line: int, col: int, word: str) -> lsp_type.Range:
+    return lsp_type.Range(
+        start=lsp_type.Position(line=line, character=col),
+        end=lsp_type.Position(line=line, character=col + len(word)),
+    )
+
+
+def _document_symbol(sym: SyntheticSymbol) -> lsp_type.DocumentSymbol:
+    return lsp_type.DocumentSymbol(
+        name=sym.name,
+        kind=sym.kind,
+        range=sym.range,
+        selection_range=sym.range,
+        detail=f"{sym.name}(arg)",
+        children=[_document_symbol(c) for c in sym.children],
+    )
+
+
+def _hierarchy_item(sym: SyntheticSymbol) -> lsp_type.CallHierarchyItem:
+    return lsp_type.CallHierarchyItem(
+        name=sym.name,
+        kind=sym.kind,
+        uri=sym.file.as_uri(),
+        range=sym.range,
+        selection_range=sym.range,
+    )
+
+
+class FakeClient(
+    WithRequestReferences,
+    WithRequestDefinition,
+    WithRequestDocumentSymbol,
+    WithRequestHover,
+    WithRequestCallHierarchy,
+    WithRequestWorkspaceSymbol,
+    WithRequestRename,
+    CapabilityClientProtocol,
+):
+    """
+    A `Client` stand-in backed by a `SyntheticWorkspace`.
+
+    `server_workers` bounds how many requests the simulated server processes at
+    once, which is what makes client-side concurrency and coalescing visible.
+    """
+
+    def __init__(
+        self,
+        workspace: SyntheticWorkspace,
+        latency: LatencyModel | None = None,
+        *,
+        server_workers: int = 4,
+    ) -> None:
+        self.workspace = workspace
+        self.latency = latency or LatencyModel()
+        self.calls: Counter[str] = Counter()
+        self.server_time = 0.0
+        self._workers = anyio.CapacityLimiter(server_workers)
+        self._doc_state = DocumentStateManager()
+        self._config_map = ConfigurationMap()
+
+    def as_uri(self, file_path: AnyPath) -> str:
+        path = Path(file_path)
+        if not path.is_absolute():
+            path = self.workspace.root / path
+        return path.as_uri()
+
+    def from_uri(self, uri: str, *, relative: bool = True) -> Path:
+        path = Path(uri.removeprefix("file://"))
+        if relative and path.is_relative_to(self.workspace.root):
+            return path.relative_to(self.workspace.root)
+        return path
+
+    def get_workspace(self) -> Any:  # noqa: ANN401
+        return {}
+
+    def get_config_map(self) -> ConfigurationMap:
+        return self._config_map
+
+    def get_document_state(self) -> DocumentStateManager:
+        return self._doc_state
+
+    @classmethod
+    def get_language_config(cls) -> LanguageConfig:
+        return LanguageConfig(
+            kind=lsp_type.LanguageKind.Python,
+            suffixes=[".py"],
+            project_files=["pyproject.toml"],
+        )
+
+    @asynccontextmanager
+    async def open_files(self, *file_paths: AnyPath) -> AsyncGenerator[None]:
+        yield
+
+    async def read_file(self, file_path: AnyPath, *, encoding: str = "utf-8") -> str:
+        self.calls["fs/read"] += 1
+        path = Path(self.as_uri(file_path).removeprefix("file://"))
+        return await anyio.Path(path).read_text(encoding=encoding)
+
+    async def write_file(self, uri: str, content: str) -> None:
+        pass
+
+    async def notify(self, msg: Any) -> None:  # noqa: ANN401
+        pass
+
+    async def apply_workspace_edit(self, edit: lsp_type.WorkspaceEdit) -> None:
+        # Left unapplied so that every iteration sees the same workspace.
+        self.calls["workspace/applyEdit"] += 1
+
+    async def request(self, req: Any, schema: Any) -> Any:  # noqa: ANN401
+        method: str = req.method
+        self.calls[method] += 1
+        async with self._workers:
+            delay = self.latency.sample()
+            self.server_time += delay
+            await anyio.sleep(delay)
+            return self._respond(method, req.params)
+
+    def _respond(self, method: str, params: Any) -> Any:  # noqa: ANN401
+        ws = self.workspace
+        match method:
+            case lsp_type.TEXT_DOCUMENT_DOCUMENT_SYMBOL:
+                path = self._path(params.text_document.uri)
+                return [_document_symbol(s) for s in ws.outlines.get(path, [])]
+            case lsp_type.TEXT_DOCUMENT_HOVER:
+                path = self._path(params.text_document.uri)
+                if not (sym := ws.symbol_at(path, params.position.line)):
+                    return None
+                return lsp_type.Hover(
+                    contents=lsp_type.MarkupContent(
+                        kind=lsp_type.MarkupKind.Markdown,
+                        value=f"```python\ndef {sym.name}(arg)\n```\n\n"
+                        f"Synthetic {sym.kind.name.lower()} `{sym.name}`.",
+                    )
+                )
+            case lsp_type.TEXT_DOCUMENT_REFERENCES:
+                assert ws.target_location is not None
+                return [ws.target_location, *ws.reference_sites]
+            case lsp_type.TEXT_DOCUMENT_DEFINITION:
+                return [ws.target_location]
+            case lsp_type.TEXT_DOCUMENT_PREPARE_CALL_HIERARCHY:
+                return [_hierarchy_item(ws.outlines[ws.paths[0]][0])]
+            case lsp_type.CALL_HIERARCHY_INCOMING_CALLS:
+                return [
+                    lsp_type.CallHierarchyIncomingCall(
+                        from_=_hierarchy_item(sym), from_ranges=[loc.range]
+                    )
+                    for loc in ws.reference_sites
+                    if (sym := ws.symbol_at(self._path(loc.uri), loc.range.start.line))
+                ]
+            case lsp_type.CALL_HIERARCHY_OUTGOING_CALLS:
+                return []
+            case lsp_type.WORKSPACE_SYMBOL:
+                query = params.query.lower()
+                return [
+                    lsp_type.WorkspaceSymbol(
+                        name=sym.name,
+                        kind=sym.kind,
+                        location=lsp_type.Location(
+                            uri=sym.file.as_uri(), range=sym.range
+                        ),
+                    )
+                    for outline in ws.outlines.values()
+                    for sym in outline
+                    if query in sym.name.lower()
+                ]
+            case lsp_type.TEXT_DOCUMENT_PREPARE_RENAME:
+                return lsp_type.PrepareRenamePlaceholder(
+                    range=_word_range(
+                        params.position.line, params.position.character, TARGET
+                    ),
+                    placeholder=TARGET,
+                )
+            case lsp_type.TEXT_DOCUMENT_RENAME:
+                assert ws.target_location is not None
+                changes: dict[str, list[lsp_type.TextEdit]] = {}
+                for loc in [ws.target_location, *ws.reference_sites]:
+                    changes.setdefault(loc.uri, []).append(
+                        lsp_type.TextEdit(range=loc.range, new_text=params.new_name)
+                    )
+                return lsp_type.WorkspaceEdit(changes=changes)
+            case _:
+                return None
+
+    def _path(self, uri: str) -> Path:
+        return self.from_uri(uri, relative=False)
+
+    def reset_stats(self) -> None:
+        self.calls.clear()
+        self.server_time = 0.0
+
+
+def lsp_calls(calls: Counter[str]) -> int:
+    """Number of simulated server round-trips (file reads excluded)."""
+    return sum(n for method, n in calls.items() if not method.startswith("fs/"))
+
+
+__all__ = [
+    "TARGET",
+    "FakeClient",
+    "LatencyModel",
+    "SyntheticWorkspace",
+    "lsp_calls",
+]
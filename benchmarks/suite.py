@@ -0,0 +1,286 @@
+"""
+Benchmark scenarios for every capability in `lsap.capability`.
+
+Each scenario issues `iterations` requests (at most `concurrency` at a time)
+against a `FakeClient` and records per-request latency, simulated server
+round-trips and, optionally, the peak traced memory of the whole run.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from collections import Counter
+from collections.abc import Awaitable, Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+import anyio
+from attrs import Factory, asdict, define, frozen
+
+from lsap.capability import (
+    Capabilities,
+    DefinitionCapability,
+    InspectCapability,
+    LocateCapability,
+    OutlineCapability,
+    ReferenceCapability,
+    RenameExecuteCapability,
+    RenamePreviewCapability,
+    SearchCapability,
+)
+from lsap.schema.definition import DefinitionRequest
+from lsap.schema.inspect import InspectRequest
+from lsap.schema.locate import Locate, LocateRequest, SymbolScope
+from lsap.schema.outline import OutlineRequest
+from lsap.schema.reference import ReferenceRequest
+from lsap.schema.rename import RenameExecuteRequest, RenamePreviewRequest
+from lsap.schema.search import SearchRequest
+
+from .fake import TARGET, FakeClient, LatencyModel, SyntheticWorkspace, lsp_calls
+
+type Operation = Callable[[Capabilities, SyntheticWorkspace, int], Awaitable[Any]]
+
+
+def create_capabilities(client: Any) -> Capabilities:  # noqa: ANN401
+    return Capabilities(
+        definition=DefinitionCapability(client),
+        locate=LocateCapability(client),
+        outline=OutlineCapability(client),
+        references=ReferenceCapability(client),
+        rename_preview=RenamePreviewCapability(client),
+        rename_execute=RenameExecuteCapability(client),
+        search=SearchCapability(client),
+        inspect=InspectCapability(client),
+    )
+
+
+def _target() -> SymbolScope:
+    return SymbolScope(symbol_path=[TARGET])
+
+
+def _nth(ws: SyntheticWorkspace, i: int) -> Path:
+    return ws.paths[i % len(ws.paths)]
+
+
+def _reference_file(ws: SyntheticWorkspace, i: int) -> Path:
+    site = ws.reference_sites[i % len(ws.reference_sites)]
+    return Path(site.uri.removeprefix("file://"))
+
+
+async def _locate(caps: Capabilities, ws: SyntheticWorkspace, i: int) -> Any:  # noqa: ANN401
+    return await caps["locate"](
+        LocateRequest(locate=Locate(file_path=_nth(ws, i), find="return <|>"))
+    )
+
+
+async def _outline_file(caps: Capabilities, ws: SyntheticWorkspace, i: int) -> Any:  # noqa: ANN401
+    return await caps["outline"](OutlineRequest(path=_nth(ws, i), recursive=True))
+
+
+async def _outline_directory(
+    caps: Capabilities,
+    ws: SyntheticWorkspace,
+    i: int,
+) -> Any:  # noqa: ANN401
+    return await caps["outline"](OutlineRequest(path=ws.root, recursive=True))
+
+
+async def _inspect(caps: Capabilities, ws: SyntheticWorkspace, i: int) -> Any:  # noqa: ANN401
+    return await caps["inspect"](
+        InspectRequest(locate=Locate(file_path=ws.paths[0], scope=_target()))
+    )
+
+
+async def _definition(caps: Capabilities, ws: SyntheticWorkspace, i: int) -> Any:  # noqa: ANN401
+    return await caps["definition"](
+        DefinitionRequest(locate=Locate(file_path=_reference_file(ws, i), find=TARGET))
+    )
+
+
+async def _references(caps: Capabilities, ws: SyntheticWorkspace, i: int) -> Any:  # noqa: ANN401
+    return await caps["references"](
+        ReferenceRequest(
+            locate=Locate(file_path=ws.paths[0], scope=_target()), max_items=20
+        )
+    )
+
+
+async def _search(caps: Capabilities, ws: SyntheticWorkspace, i: int) -> Any:  # noqa: ANN401
+    return await caps["search"](SearchRequest(query="Widget1", max_items=20))
+
+
+async def _rename(caps: Capabilities, ws: SyntheticWorkspace, i: int) -> Any:  # noqa: ANN401
+    preview = await caps["rename_preview"](
+        RenamePreviewRequest(
+            locate=Locate(file_path=ws.paths[0], scope=_target()),
+            new_name=f"renamed_{i}",
+        )
+    )
+    assert preview is not None
+    return await caps["rename_execute"](
+        RenameExecuteRequest(rename_id=preview.rename_id)
+    )
+
+
+SCENARIOS: dict[str, Operation] = {
+    "locate": _locate,
+    "outline.file": _outline_file,
+    "outline.directory": _outline_directory,
+    "inspect": _inspect,
+    "definition": _definition,
+    "references": _references,
+    "search": _search,
+    "rename": _rename,
+}
+
+
+@frozen
+class ScenarioResult:
+    name: str
+    ops: int
+    seconds: float
+    throughput: float
+    """Requests per second."""
+    p50_ms: float
+    p99_ms: float
+    lsp_calls_per_op: float
+    server_ms_per_op: float
+    """Simulated server time per request (summed over concurrent LSP calls)."""
+    peak_mib: float | None
+    calls: dict[str, int]
+
+
+@define
+class BenchConfig:
+    files: int = 50
+    symbols: int = 20
+    references: int = 200
+    iterations: int = 50
+    concurrency: int = 8
+    latency: LatencyModel = Factory(LatencyModel)
+    server_workers: int = 4
+    cold: bool = False
+    """Use a fresh client (and so empty caches) for every request."""
+    trace_memory: bool = False
+    """Record peak memory with `tracemalloc` (which slows every scenario down)."""
+
+
+def _percentile(samples: Sequence[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_scenario(
+    name: str,
+    op: Operation,
+    ws: SyntheticWorkspace,
+    config: BenchConfig,
+) -> ScenarioResult:
+    clients: list[FakeClient] = []
+
+    def new_capabilities() -> Capabilities:
+        client = FakeClient(ws, config.latency, server_workers=config.server_workers)
+        clients.append(client)
+        return create_capabilities(client)
+
+    shared = None if config.cold else new_capabilities()
+    latencies: list[float] = []
+    limiter = anyio.Semaphore(config.concurrency)
+
+    async def one(i: int) -> None:
+        caps = shared or new_capabilities()
+        async with limiter:
+            start = time.perf_counter()
+            await op(caps, ws, i)
+            latencies.append(time.perf_counter() - start)
+
+    if config.trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    async with anyio.create_task_group() as tg:
+        for i in range(config.iterations):
+            tg.start_soon(one, i)
+    seconds = time.perf_counter() - start
+    peak_mib = None
+    if config.trace_memory:
+        peak_mib = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+    calls: Counter[str] = Counter()
+    for client in clients:
+        calls.update(client.calls)
+    ops = len(latencies)
+    return ScenarioResult(
+        name=name,
+        ops=ops,
+        seconds=seconds,
+        throughput=ops / seconds if seconds else 0.0,
+        p50_ms=_percentile(latencies, 0.5) * 1000,
+        p99_ms=_percentile(latencies, 0.99) * 1000,
+        lsp_calls_per_op=lsp_calls(calls) / ops,
+        server_ms_per_op=sum(c.server_time for c in clients) * 1000 / ops,
+        peak_mib=peak_mib,
+        calls=dict(sorted(calls.items())),
+    )
+
+
+async def run_suite(
+    root: Path,
+    config: BenchConfig,
+    scenarios: Sequence[str] | None = None,
+) -> list[ScenarioResult]:
+    ws = SyntheticWorkspace.generate(
+        root, files=config.files, symbols=config.symbols, references=config.references
+    )
+    return [
+        await run_scenario(name, SCENARIOS[name], ws, config)
+        for name in scenarios or SCENARIOS
+    ]
+
+
+def format_results(results: Sequence[ScenarioResult]) -> str:
+    header = (
+        f"{'scenario':<20}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+        f"{'lsp/req':>10}{'srv ms/req':>12}{'peak MiB':>10}"
+    )
+    rows = [
+        f"{r.name:<20}{r.throughput:>10.1f}{r.p50_ms:>10.2f}{r.p99_ms:>10.2f}"
+        f"{r.lsp_calls_per_op:>10.1f}{r.server_ms_per_op:>12.2f}"
+        f"{'-' if r.peak_mib is None else f'{r.peak_mib:.2f}':>10}"
+        for r in results
+    ]
+    return "\n".join([header, "-" * len(header), *rows])
+
+
+def dump_results(results: Sequence[ScenarioResult], config: BenchConfig) -> str:
+    return json.dumps(
+        {
+            "config": asdict(config, filter=lambda a, _: not a.name.startswith("_")),
+            "results": [asdict(r) for r in results],
+        },
+        indent=2,
+    )
+
+
+def compare_results(
+    results: Sequence[ScenarioResult],
+    baseline: dict[str, Any],
+    tolerance: float,
+) -> list[str]:
+    """Describe every metric that regressed beyond `tolerance` (a ratio)."""
+    previous = {r["name"]: r for r in baseline.get("results", [])}
+    regressions: list[str] = []
+    for result in results:
+        if not (base := previous.get(result.name)):
+            continue
+        for metric in ("p50_ms", "p99_ms", "lsp_calls_per_op", "peak_mib"):
+            before, after = base.get(metric), getattr(result, metric)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + tolerance) and after - before > 1e-6:
+                regressions.append(
+                    f"{result.name}: {metric} {before:.2f} -> {after:.2f}"
+                )
+    return regressions
@@ -6,6 +6,8 @@ from lsp_client import Client
 from lsp_client.protocol import CapabilityClientProtocol
 from pydantic import BaseModel
 
+from lsap.utils.sem import AdaptiveLimiter, get_limiter
+
 
 class ClientProtocol(CapabilityClientProtocol, Protocol): ...
 
@@ -14,5 +16,10 @@ class ClientProtocol(CapabilityClientProtocol, Protocol): ...
 class Capability[Req: BaseModel, Resp: BaseModel](ABC):
     client: Client
 
+    @property
+    def limiter(self) -> AdaptiveLimiter:
+        """Concurrency limiter shared by all capabilities of the client."""
+        return get_limiter(self.client)
+
     @abstractmethod
     async def __call__(self, req: Req) -> Resp | None: ...
@@ -1,12 +1,12 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from collections.abc import Sequence
 from functools import cached_property
 from typing import override
 
-import anyio
 import asyncer
-from attrs import define, field
+from attrs import define
 from lsp_client.capability.request import (
     WithRequestDeclaration,
     WithRequestDefinition,
@@ -25,8 +25,6 @@ from .locate import LocateCapability
 
 @define
 class DefinitionCapability(Capability[DefinitionRequest, DefinitionResponse]):
-    resolve_sem: anyio.Semaphore = field(default=anyio.Semaphore(32), init=False)
-
     @cached_property
     def locate(self) -> LocateCapability:
         return LocateCapability(self.client)
@@ -68,22 +66,25 @@ class DefinitionCapability(Capability[DefinitionRequest, DefinitionResponse]):
         if not locations:
             return None
 
-        infos = []
-        async with asyncer.create_task_group() as tg:
+        # Group by file so each target file is symbolized and read once.
+        groups: defaultdict[str, list[int]] = defaultdict(list)
+        for i, loc in enumerate(locations):
+            groups[loc.uri].append(i)
+
+        infos: list[SymbolCodeInfo | None] = [None] * len(locations)
 
-            async def resolve_item(loc: Location) -> SymbolCodeInfo | None:
-                async with self.resolve_sem:
-                    target_file_path = self.client.from_uri(loc.uri)
-                    if symbol_info := await self.inspect.resolve(
-                        target_file_path,
-                        loc.range.start,
-                    ):
-                        return symbol_info
-                return None
-
-            infos = [tg.soonify(resolve_item)(loc) for loc in locations]
-        items: list[SymbolCodeInfo] = [
-            value for info in infos if (value := info.value) is not None
-        ]
+        async def resolve_file(uri: str, indices: list[int]) -> None:
+            async with self.limiter:
+                resolved = await self.inspect.resolve_many(
+                    self.client.from_uri(uri),
+                    [locations[i].range.start for i in indices],
+                )
+            for i, info in zip(indices, resolved, strict=True):
+                infos[i] = info
+
+        async with asyncer.create_task_group() as tg:
+            for uri, indices in groups.items():
+                tg.soonify(resolve_file)(uri, indices)
+        items = [info for info in infos if info is not None]
 
         return DefinitionResponse(items=items, request=req)
@@ -1,14 +1,15 @@
 from __future__ import annotations
 
+from collections.abc import Awaitable, Callable, Sequence
 from functools import cached_property
 from pathlib import Path
 from typing import override
 
+import anyio
+import asyncer
 from attrs import define
-from lsp_client.capability.request import (
-    WithRequestCallHierarchy,
-    WithRequestDocumentSymbol,
-)
+from loguru import logger
+from lsp_client.capability.request import WithRequestCallHierarchy
 from lsprotocol.types import Position as LSPPosition
 
 from lsap.schema.inspect import InspectRequest, InspectResponse
@@ -19,9 +20,9 @@ from lsap.schema.models import (
     SymbolCodeInfo,
     SymbolKind,
 )
-from lsap.utils.capability import ensure_capability, get_capability
-from lsap.utils.document import DocumentReader
-from lsap.utils.symbol import symbol_at
+from lsap.utils.capability import get_capability
+from lsap.utils.request import request_symbol_index
+from lsap.utils.snapshot import read_document
 
 from .abc import Capability
 from .locate import LocateCapability
@@ -30,6 +31,10 @@ from .outline import OutlineCapability
 
 @define
 class InspectCapability(Capability[InspectRequest, InspectResponse]):
+    section_timeout: float | None = None
+    """Timeout in seconds for each call hierarchy section. A section that times
+    out is left empty instead of failing the whole response."""
+
     @cached_property
     def locate(self) -> LocateCapability:
         return LocateCapability(self.client)
@@ -44,20 +49,17 @@ class InspectCapability(Capability[InspectRequest, InspectResponse]):
         if not location:
             return None
 
-        lsp_pos = location.position.to_lsp()
-        best_match = await self.resolve(
-            location.file_path,
-            lsp_pos,
-        )
+        file_path, lsp_pos = location.file_path, location.position.to_lsp()
+        async with asyncer.create_task_group() as tg:
+            soon_match = tg.soonify(self.resolve)(file_path, lsp_pos)
+            soon_hierarchy = tg.soonify(self._get_call_hierarchy)(file_path, lsp_pos)
 
-        if not best_match:
+        if not (best_match := soon_match.value):
             return None
 
-        call_hierarchy = await self._get_call_hierarchy(location.file_path, lsp_pos)
-
         return InspectResponse(
             info=best_match,
-            call_hierarchy=call_hierarchy,
+            call_hierarchy=soon_hierarchy.value,
         )
 
     async def _get_call_hierarchy(
@@ -67,8 +69,19 @@ class InspectCapability(Capability[InspectRequest, InspectResponse]):
         if not cap:
             return None
 
-        incoming = await cap.request_call_hierarchy_incoming_call(file_path, pos)
-        outgoing = await cap.request_call_hierarchy_outgoing_call(file_path, pos)
+        async with asyncer.create_task_group() as tg:
+            soon_incoming = tg.soonify(self._with_timeout)(
+                "incoming calls",
+                cap.request_call_hierarchy_incoming_call,
+                file_path,
+                pos,
+            )
+            soon_outgoing = tg.soonify(self._with_timeout)(
+                "outgoing calls",
+                cap.request_call_hierarchy_outgoing_call,
+                file_path,
+                pos,
+            )
 
         incoming = [
             CallHierarchyItem(
@@ -77,7 +90,7 @@ class InspectCapability(Capability[InspectRequest, InspectResponse]):
                 kind=SymbolKind.from_lsp(call.from_.kind),
                 range=Range.from_lsp(call.from_.range),
             )
-            for call in incoming or []
+            for call in soon_incoming.value or []
         ]
 
         outgoing = [
@@ -87,39 +100,70 @@ class InspectCapability(Capability[InspectRequest, InspectResponse]):
                 kind=SymbolKind.from_lsp(call.to.kind),
                 range=Range.from_lsp(call.to.range),
             )
-            for call in outgoing or []
+            for call in soon_outgoing.value or []
         ]
 
         return CallHierarchy(incoming=incoming, outgoing=outgoing)
 
+    async def _with_timeout[**P, R](
+        self,
+        section: str,
+        func: Callable[P, Awaitable[R]],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ) -> R | None:
+        if self.section_timeout is None:
+            return await func(*args, **kwargs)
+        with anyio.move_on_after(self.section_timeout):
+            return await func(*args, **kwargs)
+        logger.warning(
+            "Inspect section '{}' timed out after {}s, returning partial results",
+            section,
+            self.section_timeout,
+        )
+        return None
+
     async def resolve(
         self,
         file_path: Path,
         pos: LSPPosition,
     ) -> SymbolCodeInfo | None:
-        symbols = await ensure_capability(
-            self.client, WithRequestDocumentSymbol
-        ).request_document_symbol_list(file_path)
-        if not symbols:
-            return None
-
-        match = symbol_at(symbols, pos)
-        if not match:
-            return None
+        return (await self.resolve_many(file_path, [pos]))[0]
 
-        path, symbol = match
-        document = await self.client.read_file(file_path)
-        reader = DocumentReader(document)
-
-        code: str | None = None
-        if snippet := reader.read(symbol.range):
-            code = snippet.content
-
-        return SymbolCodeInfo(
-            file_path=file_path,
-            name=symbol.name,
-            path=path,
-            kind=SymbolKind.from_lsp(symbol.kind),
-            code=code,
-            range=Range.from_lsp(symbol.range),
+    async def resolve_many(
+        self,
+        file_path: Path,
+        positions: Sequence[LSPPosition],
+    ) -> list[SymbolCodeInfo | None]:
+        """Resolve the symbols at several positions of one file in a single pass."""
+        index = await request_symbol_index(self.client, file_path)
+        if not index:
+            return [None] * len(positions)
+
+        matches = [index.symbol_at(pos) for pos in positions]
+        if not any(matches):
+            return [None] * len(positions)
+
+        reader = await read_document(self.client, file_path)
+        snippets = iter(
+            reader.read_many([match[1].range for match in matches if match])
         )
+
+        infos: list[SymbolCodeInfo | None] = []
+        for match in matches:
+            if not match:
+                infos.append(None)
+                continue
+            path, symbol = match
+            snippet = next(snippets)
+            infos.append(
+                SymbolCodeInfo(
+                    file_path=file_path,
+                    name=symbol.name,
+                    path=path,
+                    kind=SymbolKind.from_lsp(symbol.kind),
+                    code=snippet.content if snippet else None,
+                    range=Range.from_lsp(symbol.range),
+                )
+            )
+        return infos
@@ -1,11 +1,9 @@
 import re
-from collections.abc import Iterator
 from pathlib import Path
 from typing import NamedTuple
 
 from attrs import define
 from lsp_client import Client
-from lsp_client.capability.request import WithRequestDocumentSymbol
 from lsprotocol.types import Position as LSPPosition
 from lsprotocol.types import Range as LSPRange
 
@@ -19,37 +17,14 @@ from lsap.schema.locate import (
     SymbolScope,
 )
 from lsap.schema.models import Position, Range
-from lsap.utils.capability import ensure_capability
 from lsap.utils.document import DocumentReader
-from lsap.utils.locate import detect_marker
-from lsap.utils.symbol import iter_symbols
+from lsap.utils.locate import get_find_pattern
+from lsap.utils.request import request_symbol_index
+from lsap.utils.snapshot import read_document
 
 from .abc import Capability
 
 
-def _to_regex(text: str) -> str:
-    """Convert search text to regex with sensible whitespace handling.
-
-    - Explicit whitespace: matches one or more whitespace (\\s+)
-    - Identifier-operator boundaries: matches zero or more whitespace (\\s*)
-    - Within tokens: literal match (no flexibility)
-    """
-    tokens = re.findall(r"\w+|[^\w\s]+|\s+", text)
-    if not tokens:
-        return ""
-
-    def parts() -> Iterator[str]:
-        for i, token in enumerate(tokens):
-            if token[0].isspace():
-                yield r"\s+"
-            else:
-                yield re.escape(token)
-                if i < len(tokens) - 1 and not tokens[i + 1][0].isspace():
-                    yield r"\s*"
-
-    return "".join(parts())
-
-
 class ScopeInfo(NamedTuple):
     range: LSPRange
     selection_start: LSPPosition | None
@@ -75,12 +50,10 @@ async def _get_scope_info(
 
             return ScopeInfo(LSPRange(start=start, end=end), None)
         case SymbolScope(symbol_path=path):
-            symbols = await ensure_capability(
-                client, WithRequestDocumentSymbol
-            ).request_document_symbol_list(file_path)
-            for s_path, symbol in iter_symbols(symbols or []):
-                if s_path == path:
-                    return ScopeInfo(symbol.range, symbol.selection_range.start)
+            index = await request_symbol_index(client, file_path)
+            if index and (matches := index.find(path)):
+                _, symbol = matches[0]
+                return ScopeInfo(symbol.range, symbol.selection_range.start)
             raise NotFoundError(f"Symbol {path} not found in {file_path}")
 
 
@@ -88,8 +61,7 @@ async def _get_scope_info(
 class LocateCapability(Capability[LocateRequest, LocateResponse]):
     async def __call__(self, req: LocateRequest) -> LocateResponse | None:
         locate = req.locate
-        document = await self.client.read_file(locate.file_path)
-        reader = DocumentReader(document)
+        reader = await read_document(self.client, locate.file_path)
 
         info = await _get_scope_info(
             self.client, locate.file_path, locate.scope, reader
@@ -122,27 +94,10 @@ class LocateCapability(Capability[LocateRequest, LocateResponse]):
         if not snippet:
             return None
 
-        if marker_info := detect_marker(find):
-            before, _, after = find.partition(marker_info.marker)
-            match (before, after):
-                case ("", ""):
-                    offset = 0
-                case (before, ""):
-                    pattern = re.compile(re.escape(before))
-                    if m := pattern.search(snippet.exact_content):
-                        offset = m.end()
-                    else:
-                        return None
-                case (before, after):
-                    pattern = re.compile(re.escape(before) + re.escape(after))
-                    if m := pattern.search(snippet.exact_content):
-                        offset = m.start() + len(before)
-                    else:
-                        return None
-        elif m := re.search(_to_regex(find), snippet.exact_content):
-            offset = m.start()
-        else:
+        pattern, offset_in_match = get_find_pattern(find).position
+        if not (m := pattern.search(snippet.exact_content)):
             return None
+        offset = m.start() + offset_in_match
 
         return reader.offset_to_position(snippet.range.start, offset)
 
@@ -171,8 +126,7 @@ class LocateCapability(Capability[LocateRequest, LocateResponse]):
 class LocateRangeCapability(Capability[LocateRangeRequest, LocateRangeResponse]):
     async def __call__(self, req: LocateRangeRequest) -> LocateRangeResponse | None:
         locate = req.locate
-        document = await self.client.read_file(locate.file_path)
-        reader = DocumentReader(document)
+        reader = await read_document(self.client, locate.file_path)
 
         info = await _get_scope_info(
             self.client, locate.file_path, locate.scope, reader
@@ -185,10 +139,10 @@ class LocateRangeCapability(Capability[LocateRangeRequest, LocateRangeResponse])
             if not snippet:
                 return None
 
-            re_find = _to_regex(locate.find)
-            if not re_find:
+            pattern = get_find_pattern(locate.find).range
+            if pattern is None:
                 final_range = info.range
-            elif m := re.search(re_find, snippet.exact_content):
+            elif m := pattern.search(snippet.exact_content):
                 final_range = LSPRange(
                     start=reader.offset_to_position(snippet.range.start, m.start()),
                     end=reader.offset_to_position(snippet.range.start, m.end()),
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from collections.abc import Iterable, Iterator, Sequence
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+from contextlib import aclosing
+from functools import partial
 from pathlib import Path
-from typing import override
+from typing import Final, Literal, override
 
 import anyio
-from attrs import define, field
-from lsp_client.capability.request import WithRequestDocumentSymbol, WithRequestHover
+import anyio.to_thread
+import asyncer
+from attrs import Factory, define
 from lsprotocol.types import DocumentSymbol
 from lsprotocol.types import Position as LSPPosition
 from lsprotocol.types import SymbolKind as LSPSymbolKind
@@ -19,18 +22,48 @@ from lsap.schema.outline import (
     OutlineResponse,
 )
 from lsap.schema.types import SymbolPath
-from lsap.utils.capability import ensure_capability
+from lsap.utils.client import resolve_path
+from lsap.utils.local_outline import LocalOutlineProvider, local_document_symbols
 from lsap.utils.markdown import clean_hover_content
+from lsap.utils.outline_cache import OutlineCache
+from lsap.utils.request import (
+    request_document_symbols,
+    request_hover,
+    request_symbol_index,
+)
 from lsap.utils.sem import with_sem
-from lsap.utils.symbol import iter_symbols
+from lsap.utils.snapshot import document_stamp
+from lsap.utils.symbol import SymbolIndex
+from lsap.utils.walk import DEFAULT_EXCLUDES, FileWalker
 
 from .abc import Capability
 
+_DETAIL_KINDS: Final = frozenset(
+    {
+        LSPSymbolKind.Field,
+        LSPSymbolKind.Property,
+        LSPSymbolKind.Variable,
+        LSPSymbolKind.Constant,
+        LSPSymbolKind.EnumMember,
+    }
+)
+"""Kinds whose `detail` (usually their type) is as informative as a hover."""
+
 
 @define
 class OutlineCapability(Capability[OutlineRequest, OutlineResponse]):
-    hover_sem: anyio.Semaphore = field(default=anyio.Semaphore(32), init=False)
-    directory_sem: anyio.Semaphore = field(default=anyio.Semaphore(10), init=False)
+    exclude: Sequence[str] = DEFAULT_EXCLUDES
+    """Directories that are not walked when outlining a directory."""
+    cache_file: Path | None = None
+    """Where the per-file outline cache of directory outlines is persisted
+    (e.g. `<workspace>/.lsap/outline.json`); kept in memory only if None."""
+    local_providers: Sequence[LocalOutlineProvider] = ()
+    """Providers that outline supported files without the language server (e.g.
+    `PythonOutlineProvider()`); other files, or files a provider fails on, are
+    outlined by the server."""
+    _outline_cache: OutlineCache = Factory(
+        lambda self: OutlineCache(store=self.cache_file), takes_self=True
+    )
 
     @override
     async def __call__(self, req: OutlineRequest) -> OutlineResponse | None:
@@ -39,34 +72,34 @@ class OutlineCapability(Capability[OutlineRequest, OutlineResponse]):
         return await self._handle_file(req)
 
     async def _handle_directory(self, req: OutlineRequest) -> OutlineResponse | None:
-        code_files: list[Path] = []
-
-        if req.glob:
-            base_path = req.path or Path.cwd()
-            code_files = [p for p in base_path.glob(req.glob) if p.is_file()]
-        else:
-            assert req.path is not None and req.path.is_dir()
-            lang_config = self.client.get_language_config()
-            glob_fn = req.path.rglob if req.recursive else req.path.glob
-            for suffix in lang_config.suffixes:
-                code_files.extend(p for p in glob_fn(f"*{suffix}") if p.is_file())
+        code_files = await self._directory_files(req)
+        if req.cursor is not None:
+            # Both the walker and glob results are sorted by path components.
+            cursor = Path(req.cursor).parts
+            code_files = [f for f in code_files if f.parts >= cursor]
+        scheduled = code_files[: req.max_files] if req.max_files else code_files
 
         file_groups: list[OutlineFileGroup] = []
         total_symbols = 0
-
-        async with anyio.create_task_group() as tg:
-            for file_path in code_files:
-                tg.start_soon(
-                    with_sem(
-                        self.directory_sem,
-                        self._process_file_for_directory,
-                        file_path,
-                        file_groups,
-                    )
-                )
-
-        for group in file_groups:
-            total_symbols += len(group.symbols)
+        truncated_by: Literal["max_files", "max_symbols", "time_budget"] | None = None
+        with anyio.move_on_after(req.time_budget) as scope:
+            async with aclosing(self._stream_groups(scheduled)) as groups:
+                async for group in groups:
+                    # The first file is always kept, so that a resumed scan
+                    # makes progress.
+                    if (
+                        req.max_symbols is not None
+                        and file_groups
+                        and total_symbols + len(group.symbols) > req.max_symbols
+                    ):
+                        truncated_by = "max_symbols"
+                        break
+                    file_groups.append(group)
+                    total_symbols += len(group.symbols)
+        if truncated_by is None and scope.cancelled_caught:
+            truncated_by = "time_budget"
+        elif truncated_by is None and len(file_groups) < len(code_files):
+            truncated_by = "max_files"
 
         has_subdirs = False
         if not req.recursive and req.path:
@@ -83,14 +116,94 @@ class OutlineCapability(Capability[OutlineRequest, OutlineResponse]):
             total_files=len(file_groups),
             total_symbols=total_symbols,
             has_subdirs=has_subdirs,
+            cursor=(
+                str(code_files[len(file_groups)])
+                if len(file_groups) < len(code_files)
+                else None
+            ),
+            truncated_by=truncated_by,
         )
 
-    async def _process_file_for_directory(
-        self, file_path: Path, file_groups: list[OutlineFileGroup]
-    ) -> None:
-        symbols = await ensure_capability(
-            self.client, WithRequestDocumentSymbol
-        ).request_document_symbol_list(file_path)
+    async def stream_directory(
+        self, req: OutlineRequest, *, max_buffered: int = 256
+    ) -> AsyncIterator[OutlineFileGroup]:
+        """
+        Yield the file groups of a directory outline in sorted path order, each
+        as soon as all files before it are done.
+
+        At most `max_buffered` files are outlined ahead of the next group to be
+        yielded, which bounds memory for very large directories. Close the
+        iterator (e.g. with `contextlib.aclosing`) when not consuming it to the
+        end; outstanding files are then cancelled.
+        """
+        code_files = await self._directory_files(req)
+        async with aclosing(self._stream_groups(code_files, max_buffered)) as groups:
+            async for group in groups:
+                yield group
+
+    async def _stream_groups(
+        self, code_files: Sequence[Path], max_buffered: int = 256
+    ) -> AsyncIterator[OutlineFileGroup]:
+        cache = self._outline_cache
+        await cache.load()
+
+        groups: dict[int, OutlineFileGroup] = {}
+        ready: dict[int, anyio.Event] = {}
+
+        async def outline(i: int, done: anyio.Event) -> None:
+            groups[i] = await self._outline_file_group(code_files[i])
+            done.set()
+
+        try:
+            async with asyncer.create_task_group() as tg:
+
+                def start(i: int) -> None:
+                    if i < len(code_files):
+                        ready[i] = anyio.Event()
+                        tg.start_soon(outline, i, ready[i])
+
+                for i in range(max_buffered):
+                    start(i)
+                for i in range(len(code_files)):
+                    await ready.pop(i).wait()
+                    start(i + max_buffered)
+                    try:
+                        yield groups.pop(i)
+                    except GeneratorExit:
+                        # Closed early: cancel the files still being outlined.
+                        tg.cancel_scope.cancel()
+                        return
+        finally:
+            # Keep what was outlined, even when stopped early.
+            with anyio.CancelScope(shield=True):
+                await cache.save()
+
+    async def _directory_files(self, req: OutlineRequest) -> list[Path]:
+        if req.glob:
+            base_path = req.path or Path.cwd()
+            return sorted(p for p in base_path.glob(req.glob) if p.is_file())
+
+        assert req.path is not None and req.path.is_dir()
+        walker = FileWalker(
+            tuple(self.client.get_language_config().suffixes),
+            exclude=self.exclude,
+        )
+        return await anyio.to_thread.run_sync(
+            partial(walker.walk, req.path, recursive=req.recursive)
+        )
+
+    async def _outline_file_group(self, file_path: Path) -> OutlineFileGroup:
+        """The top-level symbols of a file, from the outline cache if unchanged."""
+        stamp = document_stamp(self.client, resolve_path(self.client, file_path))
+        if stamp is not None and (group := self._outline_cache.get(file_path, stamp)):
+            return group
+
+        symbols = await local_document_symbols(
+            self.client, file_path, self.local_providers
+        )
+        if symbols is None:
+            async with self.limiter:
+                symbols = await request_document_symbols(self.client, file_path)
 
         symbols_iter = self._iter_top_symbols(symbols) if symbols else []
         items = [
@@ -105,24 +218,25 @@ class OutlineCapability(Capability[OutlineRequest, OutlineResponse]):
             for path, symbol in symbols_iter
         ]
 
-        file_groups.append(OutlineFileGroup(file_path=file_path, symbols=items))
+        group = OutlineFileGroup(file_path=file_path, symbols=items)
+        if stamp is not None:
+            self._outline_cache.put(file_path, stamp, group)
+        return group
 
     async def _handle_file(self, req: OutlineRequest) -> OutlineResponse | None:
         assert req.path is not None
         file_path = req.path
-        symbols = await ensure_capability(
-            self.client, WithRequestDocumentSymbol
-        ).request_document_symbol_list(file_path)
-        if symbols is None:
+        symbols = await local_document_symbols(
+            self.client, file_path, self.local_providers
+        )
+        if symbols is not None:
+            index = SymbolIndex(symbols)
+        elif (index := await request_symbol_index(self.client, file_path)) is None:
             return None
+        symbols = index.symbols
 
         if req.scope:
-            target_path = req.scope.symbol_path
-            matched = [
-                (path, symbol)
-                for path, symbol in iter_symbols(symbols)
-                if path == target_path
-            ]
+            matched = index.find(req.scope.symbol_path)
             if not matched:
                 return OutlineResponse(
                     path=file_path, is_directory=False, request=req, items=[]
@@ -141,7 +255,7 @@ class OutlineCapability(Capability[OutlineRequest, OutlineResponse]):
         else:
             symbols_iter = list(self._iter_top_symbols(symbols))
 
-        items = await self.resolve_symbols(file_path, symbols_iter)
+        items = await self.resolve_symbols(file_path, symbols_iter, req.hover)
 
         return OutlineResponse(
             path=file_path, is_directory=False, request=req, items=items
@@ -195,18 +309,33 @@ class OutlineCapability(Capability[OutlineRequest, OutlineResponse]):
         self,
         file_path: Path,
         symbols_with_path: Iterable[tuple[SymbolPath, DocumentSymbol]],
+        hover: Literal["none", "top-level", "all"] = "all",
     ) -> list[SymbolDetailInfo]:
+        symbols_with_path = list(symbols_with_path)
+        top_depth = min((len(path) for path, _ in symbols_with_path), default=0)
+
         items: list[SymbolDetailInfo] = []
+        # Symbols sharing a selection position share a single hover.
+        pending: dict[tuple[int, int], list[SymbolDetailInfo]] = {}
+        for path, symbol in symbols_with_path:
+            item = self._make_item(file_path, path, symbol)
+            items.append(item)
+            if hover == "none" or (hover == "top-level" and len(path) > top_depth):
+                continue
+            if symbol.kind in _DETAIL_KINDS and symbol.detail:
+                continue
+            start = symbol.selection_range.start
+            pending.setdefault((start.line, start.character), []).append(item)
+
         async with anyio.create_task_group() as tg:
-            for path, symbol in symbols_with_path:
-                item = self._make_item(file_path, path, symbol)
-                items.append(item)
+            for (line, character), targets in pending.items():
                 tg.start_soon(
                     with_sem(
-                        self.hover_sem,
+                        self.limiter,
                         self._fill_hover,
-                        item,
-                        symbol.selection_range.start,
+                        file_path,
+                        LSPPosition(line=line, character=character),
+                        targets,
                     )
                 )
 
@@ -227,8 +356,10 @@ class OutlineCapability(Capability[OutlineRequest, OutlineResponse]):
             range=Range.from_lsp(symbol.range),
         )
 
-    async def _fill_hover(self, item: SymbolDetailInfo, pos: LSPPosition) -> None:
-        if hover := await ensure_capability(
-            self.client, WithRequestHover
-        ).request_hover(item.file_path, pos):
-            item.hover = clean_hover_content(hover.value)
+    async def _fill_hover(
+        self, file_path: Path, pos: LSPPosition, items: Sequence[SymbolDetailInfo]
+    ) -> None:
+        if hover := await request_hover(self.client, file_path, pos):
+            content = clean_hover_content(hover.value)
+            for item in items:
+                item.hover = content
@@ -1,43 +1,123 @@
+from collections import defaultdict
+from collections.abc import AsyncIterator, Hashable
 from functools import cached_property
+from pathlib import Path
 
 import anyio
 import asyncer
-from attrs import Factory, define, field
+from attrs import Factory, define
 from lsp_client.capability.request import (
-    WithRequestDocumentSymbol,
-    WithRequestHover,
     WithRequestImplementation,
     WithRequestReferences,
 )
 from lsprotocol.types import Location
-from lsprotocol.types import Position as LSPPosition
-from lsprotocol.types import Range as LSPRange
 
 from lsap.schema.models import Location as LSAPLocation
 from lsap.schema.models import Position, Range, SymbolDetailInfo, SymbolKind
-from lsap.schema.reference import ReferenceItem, ReferenceRequest, ReferenceResponse
-from lsap.utils.cache import PaginationCache
+from lsap.schema.reference import (
+    ReferenceFileGroup,
+    ReferenceItem,
+    ReferenceRequest,
+    ReferenceResponse,
+)
+from lsap.utils.cache import LRUCache, PaginationCache
 from lsap.utils.capability import ensure_capability
-from lsap.utils.document import DocumentReader
+from lsap.utils.document import Snippet
 from lsap.utils.markdown import clean_hover_content
-from lsap.utils.pagination import paginate
-from lsap.utils.symbol import symbol_at
+from lsap.utils.pagination import Page, paginate
+from lsap.utils.request import request_hover, request_symbol_index
+from lsap.utils.snapshot import document_stamp, read_document
+from lsap.utils.symbol import SymbolIndex
 
 from .abc import Capability
 from .locate import LocateCapability
 
+type _ItemKey = tuple[str, int, int, int, int, int]
+type _MemoKey = tuple[Hashable, _ItemKey]
+
+
+def _item_key(loc: Location, context_lines: int) -> _ItemKey:
+    start, end = loc.range.start, loc.range.end
+    return (
+        loc.uri,
+        start.line,
+        start.character,
+        end.line,
+        end.character,
+        context_lines,
+    )
+
 
 @define
 class ReferenceCapability(Capability[ReferenceRequest, ReferenceResponse]):
-    _cache: PaginationCache[ReferenceItem] = Factory(PaginationCache)
-    process_sem: anyio.Semaphore = field(default=anyio.Semaphore(32), init=False)
+    _cache: PaginationCache[Location] = Factory(PaginationCache)
+    _items: LRUCache[_MemoKey, ReferenceItem] = Factory(lambda: LRUCache(capacity=1024))
+    """Enriched items by location and document stamp, so that they are reused
+    for as long as the document is unchanged."""
 
     @cached_property
     def locate(self) -> LocateCapability:
         return LocateCapability(client=self.client)
 
     async def __call__(self, req: ReferenceRequest) -> ReferenceResponse | None:
-        async def fetcher() -> list[ReferenceItem] | None:
+        result = await self._page(req)
+        if result is None:
+            return None
+
+        items = await self._enrich(result.items, req.context_lines)
+
+        return ReferenceResponse(
+            request=req,
+            items=items,
+            start_index=req.start_index,
+            max_items=req.max_items if req.max_items is not None else len(items),
+            total=result.total,
+            has_more=result.has_more,
+            pagination_id=result.pagination_id,
+        )
+
+    async def stream(self, req: ReferenceRequest) -> AsyncIterator[ReferenceFileGroup]:
+        """
+        Like calling the capability, but yield the requested page one file at a
+        time, as soon as that file has been enriched.
+
+        Files are enriched concurrently and yielded in the same order as the
+        items of `ReferenceResponse`. Close the iterator (e.g. with
+        `contextlib.aclosing`) when not consuming it to the end; outstanding
+        files are then cancelled.
+        """
+        if (result := await self._page(req)) is None:
+            return
+
+        groups: dict[str, list[Location]] = {}
+        for loc in result.items:
+            groups.setdefault(loc.uri, []).append(loc)
+
+        results: list[list[ReferenceItem]] = [[] for _ in groups]
+        ready = [anyio.Event() for _ in groups]
+
+        async def enrich(i: int, locations: list[Location]) -> None:
+            results[i] = await self._enrich(locations, req.context_lines)
+            ready[i].set()
+
+        async with asyncer.create_task_group() as tg:
+            for i, locations in enumerate(groups.values()):
+                tg.start_soon(enrich, i, locations)
+            for i, uri in enumerate(groups):
+                await ready[i].wait()
+                try:
+                    yield ReferenceFileGroup(
+                        request=req,
+                        file_path=self.client.from_uri(uri),
+                        items=results[i],
+                    )
+                except GeneratorExit:
+                    # Closed early: cancel the files still being enriched.
+                    tg.cancel_scope.cancel()
+                    return
+
+    async def _page(self, req: ReferenceRequest) -> Page[Location] | None:
+        async def fetcher() -> list[Location] | None:
             if not (loc_resp := await self.locate(req)):
                 return None
 
@@ -61,90 +141,120 @@ class ReferenceCapability(Capability[ReferenceRequest, ReferenceResponse]):
             ):
                 locations.extend(impls)
 
-            if not locations:
-                return []
+            # Only the raw locations are cached; enrichment is deferred to the
+            # page that is actually requested.
+            locations.sort(
+                key=lambda x: (self.client.from_uri(x.uri), x.range.start.line)
+            )
+            return locations
+
+        return await paginate(req, self._cache, fetcher)
 
-            items = []
-            async with asyncer.create_task_group() as tg:
-                for loc in locations:
-                    tg.soonify(self._process_reference)(loc, req.context_lines, items)
+    async def _enrich(
+        self, locations: list[Location], context_lines: int
+    ) -> list[ReferenceItem]:
+        """Enrich a page of locations, reusing previously enriched items of
+        unchanged documents.
 
-            items.sort(
-                key=lambda x: (x.location.file_path, x.location.range.start.line)
-            )
-            return items
+        Uncached locations are grouped by file so that each file is read and
+        symbolized once, no matter how many references it contains.
+        """
+        resolved: dict[_ItemKey, ReferenceItem] = {}
+        stamps: dict[str, Hashable | None] = {}
+        groups: defaultdict[str, list[Location]] = defaultdict(list)
+        for loc in locations:
+            if loc.uri not in stamps:
+                path = self.client.from_uri(loc.uri, relative=False)
+                stamps[loc.uri] = document_stamp(self.client, path)
+            key = _item_key(loc, context_lines)
+            stamp = stamps[loc.uri]
+            if stamp is not None and (cached := self._items.get((stamp, key))):
+                resolved[key] = cached
+            else:
+                groups[loc.uri].append(loc)
 
-        result = await paginate(req, self._cache, fetcher)
-        if result is None:
-            return None
+        async with asyncer.create_task_group() as tg:
+            for uri, file_locations in groups.items():
+                tg.soonify(self._process_file)(
+                    uri, file_locations, context_lines, stamps[uri], resolved
+                )
 
-        return ReferenceResponse(
-            request=req,
-            items=result.items,
-            start_index=req.start_index,
-            max_items=req.max_items if req.max_items is not None else len(result.items),
-            total=result.total,
-            has_more=result.has_more,
-            pagination_id=result.pagination_id,
+        return [
+            item
+            for loc in locations
+            if (item := resolved.get(_item_key(loc, context_lines)))
+        ]
+
+    async def _process_file(
+        self,
+        uri: str,
+        locations: list[Location],
+        context_lines: int,
+        stamp: Hashable | None,
+        resolved: dict[_ItemKey, ReferenceItem],
+    ) -> None:
+        async with self.limiter:
+            file_path = self.client.from_uri(uri)
+            reader = await read_document(self.client, file_path)
+            index = await request_symbol_index(self.client, file_path)
+
+        snippets = reader.read_many(
+            [loc.range for loc in locations],
+            context_lines=context_lines,
+            trim_empty=True,
         )
+        async with asyncer.create_task_group() as tg:
+            for loc, snippet in zip(locations, snippets, strict=True):
+                if snippet is not None:
+                    tg.soonify(self._process_reference)(
+                        loc, context_lines, file_path, snippet, index, stamp, resolved
+                    )
 
     async def _process_reference(
         self,
         loc: Location,
         context_lines: int,
-        items: list[ReferenceItem],
+        file_path: Path,
+        snippet: Snippet,
+        index: SymbolIndex | None,
+        stamp: Hashable | None,
+        resolved: dict[_ItemKey, ReferenceItem],
     ) -> None:
-        async with self.process_sem:
-            file_path = self.client.from_uri(loc.uri)
-            content = await self.client.read_file(file_path)
-            reader = DocumentReader(content)
-
-            range = loc.range
-            context_range = LSPRange(
-                start=LSPPosition(
-                    line=max(0, range.start.line - context_lines), character=0
+        range = loc.range
+        symbol: SymbolDetailInfo | None = None
+        if index and (match := index.symbol_at(range.start)):
+            path, sym = match
+            kind = SymbolKind.from_lsp(sym.kind)
+
+            symbol = SymbolDetailInfo(
+                file_path=file_path,
+                name=sym.name,
+                path=path,
+                kind=kind,
+                detail=sym.detail,
+                range=Range(
+                    start=Position.from_lsp(sym.range.start),
+                    end=Position.from_lsp(sym.range.end),
                 ),
-                end=LSPPosition(line=range.end.line + context_lines + 1, character=0),
             )
-            if not (snippet := reader.read(context_range, trim_empty=True)):
-                return
-
-            symbol: SymbolDetailInfo | None = None
-            if (
-                symbols := await ensure_capability(
-                    self.client, WithRequestDocumentSymbol
-                ).request_document_symbol_list(file_path)
-            ) and (match := symbol_at(symbols, range.start)):
-                path, sym = match
-                kind = SymbolKind.from_lsp(sym.kind)
-
-                symbol = SymbolDetailInfo(
-                    file_path=file_path,
-                    name=sym.name,
-                    path=path,
-                    kind=kind,
-                    detail=sym.detail,
-                    range=Range(
-                        start=Position.from_lsp(sym.range.start),
-                        end=Position.from_lsp(sym.range.end),
-                    ),
-                )
 
-                if hover := await ensure_capability(
-                    self.client, WithRequestHover
-                ).request_hover(file_path, range.start):
-                    symbol.hover = clean_hover_content(hover.value)
-
-            items.append(
-                ReferenceItem(
-                    location=LSAPLocation(
-                        file_path=file_path,
-                        range=Range(
-                            start=Position.from_lsp(range.start),
-                            end=Position.from_lsp(range.end),
-                        ),
-                    ),
-                    code=snippet.content,
-                    symbol=symbol,
-                )
-            )
+            async with self.limiter:
+                hover = await request_hover(self.client, file_path, range.start)
+            if hover:
+                symbol.hover = clean_hover_content(hover.value)
+
+        item = ReferenceItem(
+            location=LSAPLocation(
+                file_path=file_path,
+                range=Range(
+                    start=Position.from_lsp(range.start),
+                    end=Position.from_lsp(range.end),
+                ),
+            ),
+            code=snippet.content,
+            symbol=symbol,
+        )
+        key = _item_key(loc, context_lines)
+        if stamp is not None:
+            self._items.put((stamp, key), item)
+        resolved[key] = item
@@ -6,9 +6,8 @@ from functools import cached_property
 from pathlib import Path
 from typing import override
 
-import anyio
 import asyncer
-from attrs import define, field
+from attrs import define
 from lsp_client.capability.request import WithRequestRename
 from lsp_client.protocol import CapabilityClientProtocol
 from lsp_client.utils.types import lsp_type
@@ -30,6 +29,8 @@ from lsap.utils.cache import LRUCache
 from lsap.utils.capability import ensure_capability
 from lsap.utils.document import DocumentReader
 from lsap.utils.id import generate_short_id
+from lsap.utils.request import update_document
+from lsap.utils.snapshot import read_document
 
 from .abc import Capability
 from .locate import LocateCapability
@@ -142,8 +143,6 @@ def _filter_edit(
 
 @define
 class RenamePreviewCapability(Capability[RenamePreviewRequest, RenamePreviewResponse]):
-    file_sem: anyio.Semaphore = field(default=anyio.Semaphore(32), init=False)
-
     @cached_property
     def locate(self) -> LocateCapability:
         return LocateCapability(self.client)
@@ -154,8 +153,7 @@ class RenamePreviewCapability(Capability[RenamePreviewRequest, RenamePreviewResp
             return None
 
         path, pos = locate.file_path, locate.position.to_lsp()
-        content = await self.client.read_file(path)
-        reader = DocumentReader(content)
+        reader = await read_document(self.client, path)
 
         prepare = await ensure_capability(
             self.client, WithRequestRename
@@ -211,12 +209,11 @@ class RenamePreviewCapability(Capability[RenamePreviewRequest, RenamePreviewResp
         *,
         reader: DocumentReader | None = None,
     ) -> RenameFileChange | None:
-        async with self.file_sem:
+        async with self.limiter:
             if reader is None:
-                content = await self.client.read_file(
-                    self.client.from_uri(uri, relative=False)
+                reader = await read_document(
+                    self.client, self.client.from_uri(uri, relative=False)
                 )
-                reader = DocumentReader(content)
 
             diffs: list[RenameDiff] = []
             for edit in edits:
@@ -230,9 +227,9 @@ class RenamePreviewCapability(Capability[RenamePreviewRequest, RenamePreviewResp
 
                 if start.line == end.line:
                     modified_line = (
-                        line_raw[: start.character]
+                        line_raw[: reader.to_column(start)]
                         + new_text
-                        + line_raw[end.character :]
+                        + line_raw[reader.to_column(end) :]
                     ).rstrip("\r\n")
                 else:
                     modified_line = new_text
@@ -254,8 +251,6 @@ class RenamePreviewCapability(Capability[RenamePreviewRequest, RenamePreviewResp
 
 @define
 class RenameExecuteCapability(Capability[RenameExecuteRequest, RenameExecuteResponse]):
-    file_sem: anyio.Semaphore = field(default=anyio.Semaphore(32), init=False)
-
     @override
     async def __call__(self, req: RenameExecuteRequest) -> RenameExecuteResponse | None:
         cached = _preview_cache.get(req.rename_id)
@@ -277,6 +272,10 @@ class RenameExecuteCapability(Capability[RenameExecuteRequest, RenameExecuteResp
             self.client,
             WithRequestRename,
         ).apply_workspace_edit(edit)
+        for uri, text_edits in iter_text_document_edits(edit):
+            update_document(
+                self.client, self.client.from_uri(uri, relative=False), text_edits
+            )
         _preview_cache.pop(req.rename_id)
 
         return RenameExecuteResponse(
@@ -311,12 +310,11 @@ class RenameExecuteCapability(Capability[RenameExecuteRequest, RenameExecuteResp
         *,
         reader: DocumentReader | None = None,
     ) -> RenameFileChange | None:
-        async with self.file_sem:
+        async with self.limiter:
             if reader is None:
-                content = await self.client.read_file(
-                    self.client.from_uri(uri, relative=False)
+                reader = await read_document(
+                    self.client, self.client.from_uri(uri, relative=False)
                 )
-                reader = DocumentReader(content)
 
             diffs: list[RenameDiff] = []
             for edit in edits:
@@ -330,9 +328,9 @@ class RenameExecuteCapability(Capability[RenameExecuteRequest, RenameExecuteResp
 
                 if start.line == end.line:
                     modified_line = (
-                        line_raw[: start.character]
+                        line_raw[: reader.to_column(start)]
                         + new_text
-                        + line_raw[end.character :]
+                        + line_raw[reader.to_column(end) :]
                     ).rstrip("\r\n")
                 else:
                     modified_line = new_text
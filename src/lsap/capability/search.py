@@ -1,20 +1,31 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
+from pathlib import Path
 from typing import override
 
+import anyio
+import anyio.to_thread
+import asyncer
 from attrs import Factory, define
 from lsp_client.capability.request import WithRequestWorkspaceSymbol
 from lsp_client.capability.request.workspace_symbol import (
     WithRequestWorkspaceSymbolResolve,
 )
-from lsprotocol.types import Location, WorkspaceSymbol
+from lsprotocol.types import Location, LocationUriOnly, WorkspaceSymbol
 
 from lsap.schema.models import SymbolKind
 from lsap.schema.search import SearchItem, SearchRequest, SearchResponse
 from lsap.utils.cache import PaginationCache
 from lsap.utils.capability import ensure_capability
-from lsap.utils.pagination import paginate
+from lsap.utils.pagination import Page, paginate
+from lsap.utils.request import (
+    request_symbol_index,
+    request_workspace_symbol_resolve,
+)
+from lsap.utils.search_cache import get_search_cache
+from lsap.utils.walk import FileWalker
+from lsap.utils.workspace_index import get_workspace_index
 
 from .abc import Capability
 
@@ -26,9 +37,27 @@ class SearchCapability(Capability[SearchRequest, SearchResponse]):
     @override
     async def __call__(self, req: SearchRequest) -> SearchResponse | None:
         async def fetcher() -> list[WorkspaceSymbol]:
-            symbols = await ensure_capability(
-                self.client, WithRequestWorkspaceSymbol
-            ).request_workspace_symbol_list(req.query)
+            index = get_workspace_index(self.client)
+            if index.ready:
+                if index.check_due:
+                    await self._refresh_index(index.stale(self.client))
+                symbols = index.search(req.query, req.kinds)
+                # Between full checks, only the files of the results are checked.
+                paths = {
+                    self.client.from_uri(s.location.uri, relative=False)
+                    for s in symbols
+                }
+                if changed := index.stale(self.client, paths):
+                    await self._refresh_index(changed)
+                    symbols = index.search(req.query, req.kinds)
+                return symbols
+
+            cache = get_search_cache(self.client)
+            if (symbols := cache.get(req.query)) is None:
+                symbols = await ensure_capability(
+                    self.client, WithRequestWorkspaceSymbol
+                ).request_workspace_symbol_list(req.query)
+                cache.put(req.query, symbols)
 
             if req.kinds:
                 kind_set = set(req.kinds)
@@ -42,12 +71,7 @@ class SearchCapability(Capability[SearchRequest, SearchResponse]):
         if result is None:
             return None
 
-        # Resolve items in the current page
-        symbols = result.items
-        if isinstance(self.client, WithRequestWorkspaceSymbolResolve):
-            symbols = await self.client.resolve_workspace_symbols(symbols)
-
-        items = self._to_search_items(symbols)
+        items = self._to_search_items(await self._resolve_page(req, result))
 
         return SearchResponse(
             request=req,
@@ -59,6 +83,69 @@ class SearchCapability(Capability[SearchRequest, SearchResponse]):
             pagination_id=result.pagination_id,
         )
 
+    async def _resolve_page(
+        self, req: SearchRequest, page: Page[WorkspaceSymbol]
+    ) -> Sequence[WorkspaceSymbol]:
+        """
+        Resolve the symbols of the page that lack a range.
+
+        Resolved symbols replace the unresolved ones in the pagination entry,
+        and resolutions are memoized across searches, so each symbol is only
+        resolved once.
+        """
+        if not isinstance(self.client, WithRequestWorkspaceSymbolResolve):
+            return page.items
+        if (entry := self._symbol_cache.get(page.pagination_id)) is None:
+            return page.items
+
+        start = req.start_index
+        end = start + len(page.items)
+
+        async def resolve(i: int) -> None:
+            async with self.limiter:
+                entry[i] = await request_workspace_symbol_resolve(self.client, entry[i])
+
+        async with asyncer.create_task_group() as tg:
+            for i in range(start, min(end, len(entry))):
+                if isinstance(entry[i].location, LocationUriOnly):
+                    tg.soonify(resolve)(i)
+        return entry[start:end]
+
+    async def index_workspace(self, paths: Iterable[Path] | None = None) -> None:
+        """
+        Index the document symbols of `paths` (by default, every source file in
+        the workspace folders that is not excluded or ignored), then answer
+        searches from the local index.
+
+        Indexed files are re-indexed when they change; files created afterwards
+        are only picked up by indexing them again.
+        """
+        if paths is None:
+            walker = FileWalker(tuple(self.client.get_language_config().suffixes))
+            folders = [folder.path for folder in self.client.get_workspace().values()]
+            paths = [
+                path
+                for folder in folders
+                for path in await anyio.to_thread.run_sync(walker.walk, folder)
+            ]
+        await self._refresh_index(paths)
+        get_workspace_index(self.client).ready = True
+
+    async def _refresh_index(self, paths: Iterable[Path]) -> None:
+        index = get_workspace_index(self.client)
+
+        async def refresh(path: Path) -> None:
+            if not path.is_file():
+                index.remove(path)
+                return
+            async with self.limiter:
+                # Feeds the index as a side effect.
+                await request_symbol_index(self.client, path)
+
+        async with asyncer.create_task_group() as tg:
+            for path in paths:
+                tg.soonify(refresh)(path)
+
     def _to_search_items(self, symbols: Sequence[WorkspaceSymbol]) -> list[SearchItem]:
         items = []
         for symbol in symbols:
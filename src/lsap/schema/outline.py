@@ -84,7 +84,7 @@ Request:
 """
 
 from pathlib import Path
-from typing import Final, Self, override
+from typing import Final, Literal, Self, override
 
 from pydantic import ConfigDict, model_validator
 
@@ -115,11 +115,15 @@ class OutlineRequest(Request):
     **File Mode**: When `path` points to a file, returns symbol hierarchy.
     - recursive=False (default): Only top-level symbols (classes, top-level functions)
     - recursive=True: All symbols including nested members (methods, nested functions)
+    - hover: Which symbols to fetch documentation for ("all", "top-level" or "none");
+      use "top-level" or "none" for large files
 
     **Directory Mode**: When `path` points to a directory, lists code files and symbols.
     - recursive=False (default): Only files in the immediate directory
     - recursive=True: Recursively scan subdirectories
     - glob: Optional glob pattern to filter files (e.g., "**/*.py", "src/**/*.ts")
+    - max_files / max_symbols / time_budget: Stop early and return a `cursor`
+      to continue from
 
     If `scope` is provided (file mode only), it will locate the specified symbol
     and return the outline for that symbol and its children.
@@ -133,6 +137,16 @@ class OutlineRequest(Request):
     """Optional symbol path to narrow the outline (e.g. `MyClass` or `MyClass.my_method`). Only valid for files."""
     recursive: bool = False
     """If true: for directories, scan subdirectories; for files, include all nested symbols."""
+    hover: Literal["none", "top-level", "all"] = "all"
+    """Which symbols get hover documentation: none, only the outermost listed ones, or all. Only used for files."""
+    max_files: int | None = None
+    """Maximum number of files to outline. Only valid for directory mode."""
+    max_symbols: int | None = None
+    """Maximum number of symbols to return. Only valid for directory mode."""
+    time_budget: float | None = None
+    """Seconds after which to stop and return what is done. Only valid for directory mode."""
+    cursor: str | None = None
+    """The `cursor` of a truncated directory outline, to continue where it stopped."""
 
     @model_validator(mode="after")
     def validate_request_fields(self) -> Self:
@@ -155,6 +169,19 @@ class OutlineRequest(Request):
         if self.scope and self.path and self.path.is_dir():
             raise ValueError("scope cannot be used with directory paths")
 
+        # Budget-related validations (directory mode only)
+        budget = (self.max_files, self.max_symbols, self.time_budget, self.cursor)
+        if any(v is not None for v in budget):
+            if self.path and self.path.is_file():
+                raise ValueError(
+                    "max_files, max_symbols, time_budget and cursor can only be "
+                    "used with directories"
+                )
+            if any(v is not None and v <= 0 for v in budget[:3]):
+                raise ValueError(
+                    "max_files, max_symbols and time_budget must be positive"
+                )
+
         return self
 
 
@@ -188,6 +215,14 @@ No symbols found.
 
 {% endfor -%}
 
+{% if cursor != nil -%}
+---
+
+> [!TIP]
+> Outline stopped early ({{ truncated_by }} reached).
+> To continue, use: `cursor="{{ cursor }}"`
+{% endif -%}
+
 {% if has_subdirs and request.recursive == false -%}
 ---
 
@@ -197,10 +232,34 @@ No symbols found.
 """
 
 
+file_group_markdown_template: Final = """
+## `{{ file_path }}`
+
+{% if symbols.size == 0 -%}
+No symbols found.
+{%- else -%}
+{%- for symbol in symbols %}
+- `{{ symbol.name }}` (`{{ symbol.kind }}`)
+{%- endfor %}
+{%- endif %}
+"""
+
+
 class OutlineFileGroup(Response):
+    """
+    The top-level symbols of one file in a directory outline, as streamed by
+    `OutlineCapability.stream_directory`.
+    """
+
     file_path: Path
     symbols: list[OutlineFileItem]
 
+    model_config = ConfigDict(
+        json_schema_extra={
+            "markdown": file_group_markdown_template,
+        }
+    )
+
 
 class OutlineResponse(Response):
     path: Path
@@ -211,6 +270,9 @@ class OutlineResponse(Response):
     total_files: int | None = None
     total_symbols: int | None = None
     has_subdirs: bool = False
+    cursor: str | None = None
+    """Set when a directory outline stopped early: where to continue from."""
+    truncated_by: Literal["max_files", "max_symbols", "time_budget"] | None = None
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -56,11 +56,12 @@ Request:
 ```
 """
 
+from pathlib import Path
 from typing import Final, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
-from ._abc import PaginatedRequest, PaginatedResponse
+from ._abc import PaginatedRequest, PaginatedResponse, Response
 from .locate import LocateRequest
 from .models import Location, SymbolDetailInfo
 
@@ -88,16 +89,7 @@ class ReferenceRequest(PaginatedRequest, LocateRequest):
     """Number of lines around the match to include"""
 
 
-markdown_template: Final = """
-# {{ request.mode | capitalize }} Found
-
-{% if total != nil -%}
-Total {{ request.mode }}: {{ total }} | Showing: {{ items.size }}{% if max_items != nil %} (Offset: {{ start_index }}, Limit: {{ max_items }}){% endif %}
-{%- endif %}
-
-{% if items.size == 0 -%}
-No {{ request.mode }} found.
-{%- else -%}
+_items_template: Final = """
 {%- for item in items -%}
 ### `{{ item.location.file_path }}:{{ item.location.range.start.line }}`
 {%- if item.symbol != nil %}
@@ -109,7 +101,21 @@ In `{{ item.symbol.path | join: "." }}` (`{{ item.symbol.kind }}`)
 ```
 
 {% endfor -%}
+"""
+
+markdown_template: Final = (
+    """
+# {{ request.mode | capitalize }} Found
+
+{% if total != nil -%}
+Total {{ request.mode }}: {{ total }} | Showing: {{ items.size }}{% if max_items != nil %} (Offset: {{ start_index }}, Limit: {{ max_items }}){% endif %}
+{%- endif %}
 
+{% if items.size == 0 -%}
+No {{ request.mode }} found.
+{%- else -%}"""
+    + _items_template
+    + """
 {% if has_more -%}
 ---
 > [!TIP]
@@ -118,6 +124,7 @@ In `{{ item.symbol.path | join: "." }}` (`{{ item.symbol.kind }}`)
 {%- endif %}
 {%- endif %}
 """
+)
 
 
 class ReferenceResponse(PaginatedResponse):
@@ -131,7 +138,22 @@ class ReferenceResponse(PaginatedResponse):
     )
 
 
+class ReferenceFileGroup(Response):
+    """The references found in one file, as streamed by `ReferenceCapability.stream`."""
+
+    request: ReferenceRequest
+    file_path: Path
+    items: list[ReferenceItem]
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "markdown": _items_template,
+        }
+    )
+
+
 __all__ = [
+    "ReferenceFileGroup",
     "ReferenceItem",
     "ReferenceRequest",
     "ReferenceResponse",
@@ -1,6 +1,7 @@
 from collections import OrderedDict
+from collections.abc import Callable
 
-from attrs import Factory, define
+from attrs import Factory, define, frozen
 
 from .id import generate_short_id
 
@@ -37,6 +38,12 @@ class LRUCache[K, V]:
         """
         return self._cache.pop(key, None)
 
+    def items(self) -> list[tuple[K, V]]:
+        """
+        All cached items, least recently used first, without touching their order.
+        """
+        return list(self._cache.items())
+
 
 @define
 class PaginationCache[T]:
@@ -62,3 +69,65 @@ class PaginationCache[T]:
         pagination_id = generate_short_id()
         self._inner.put(pagination_id, data)
         return pagination_id
+
+
+@define
+class SizedLRUCache[K, V]:
+    """
+    An LRU cache bounded by the total size of its values rather than their count.
+    """
+
+    max_size: int
+    sizeof: Callable[[V], int]
+    _cache: OrderedDict[K, tuple[V, int]] = Factory(OrderedDict)
+    _size: int = 0
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached values."""
+        return self._size
+
+    def get(self, key: K) -> V | None:
+        """
+        Retrieve data from the cache and move it to the end (MRU).
+        """
+        if key not in self._cache:
+            return None
+        self._cache.move_to_end(key)
+        return self._cache[key][0]
+
+    def put(self, key: K, value: V) -> None:
+        """
+        Store data in the cache, evicting LRU entries until it fits.
+
+        Values larger than the whole cache are not stored.
+        """
+        self.pop(key)
+        size = self.sizeof(value)
+        if size > self.max_size:
+            return
+        self._cache[key] = (value, size)
+        self._size += size
+        while self._size > self.max_size:
+            _, (_, evicted) = self._cache.popitem(last=False)
+            self._size -= evicted
+
+    def pop(self, key: K) -> V | None:
+        """
+        Remove and return an item from the cache.
+        """
+        if (entry := self._cache.pop(key, None)) is None:
+            return None
+        self._size -= entry[1]
+        return entry[0]
+
+
+@frozen
+class CacheStats:
+    hits: int
+    misses: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,68 @@
+import weakref
+from collections.abc import Callable
+from functools import cache
+from pathlib import Path
+
+from attrs import Factory, define
+from lsp_client import Client
+from lsp_client.protocol import GeneralCapabilityProtocol
+from lsp_client.utils.types import AnyPath
+from lsprotocol.types import GeneralClientCapabilities, PositionEncodingKind
+
+
+@define
+class ClientLocal[T]:
+    """
+    Per-client storage, similar to a thread-local but keyed by client identity.
+
+    Values are created lazily by `factory` and dropped once the client is
+    garbage collected, so state never leaks between clients.
+    """
+
+    factory: Callable[[], T]
+    _values: dict[int, T] = Factory(dict)
+
+    def get(self, client: object) -> T:
+        key = id(client)
+        if key not in self._values:
+            self.set(client, self.factory())
+        return self._values[key]
+
+    def set(self, client: object, value: T) -> None:
+        """Replace the value of `client` (instead of the one `factory` creates)."""
+        key = id(client)
+        if key not in self._values:
+            weakref.finalize(client, self._values.pop, key, None)
+        self._values[key] = value
+
+
+def resolve_path(client: Client, file_path: AnyPath) -> Path:
+    """Resolve a (possibly workspace-relative) path to an absolute path."""
+    try:
+        return client.from_uri(client.as_uri(file_path), relative=False)
+    except (ValueError, KeyError):
+        return Path(file_path)
+
+
+@cache
+def _position_encoding(client_cls: type) -> PositionEncodingKind:
+    general = GeneralClientCapabilities()
+    if issubclass(client_cls, GeneralCapabilityProtocol):
+        client_cls.register_general_capability(general)
+    match general.position_encodings:
+        case [encoding]:
+            return PositionEncodingKind(encoding)
+        case _:
+            return PositionEncodingKind.Utf16
+
+
+def position_encoding(client: object) -> PositionEncodingKind:
+    """
+    Encoding of the `character` field in positions exchanged with the server.
+
+    `lsp_client` does not keep the server's `initialize` result, so this is
+    derived from what the client advertises: a server must pick one of the
+    offered encodings, and falls back to the mandatory UTF-16 when none (or
+    no single one) is offered.
+    """
+    return _position_encoding(type(client))
@@ -1,12 +1,34 @@
 import re
 import textwrap
-from bisect import bisect_right
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
 from functools import cached_property
+from itertools import accumulate
 
-from attrs import define, frozen
+from attrs import Factory, define, field, frozen
 from lsprotocol.types import Position as LSPPosition
+from lsprotocol.types import PositionEncodingKind, TextEdit
 from lsprotocol.types import Range as LSPRange
 
+_ASTRAL = re.compile("[\U00010000-\U0010ffff]")
+
+
+def _unit_width(char: str, encoding: PositionEncodingKind) -> int:
+    code = ord(char)
+    if encoding == PositionEncodingKind.Utf16:
+        return 2 if code > 0xFFFF else 1
+    return 1 if code < 0x80 else 2 if code < 0x800 else 3 if code < 0x10000 else 4
+
+
+def _common_prefix_length(strings: Sequence[str]) -> int:
+    if not strings:
+        return 0
+    first, last = min(strings), max(strings)
+    for i, char in enumerate(first):
+        if char != last[i]:
+            return i
+    return len(first)
+
 
 @frozen
 class Snippet:
@@ -26,18 +48,90 @@ class Snippet:
 
 @define
 class DocumentReader:
-    document: str
+    """
+    Line-indexed view of a document.
 
-    @cached_property
-    def _lines(self) -> list[str]:
-        return self.document.splitlines(keepends=True)
+    LSP `character` values are interpreted in `encoding` code units, while all
+    offsets are code-point offsets into `document`. Lines whose code units map
+    1:1 to code points (ASCII, or BMP-only for UTF-16) are converted without any
+    extra work; other lines get a code-unit index built on first use.
+    """
+
+    _text: str = field(alias="document")
+    encoding: PositionEncodingKind = PositionEncodingKind.Utf16
+
+    _units: dict[int, list[int] | None] = Factory(dict)
+    """Per line: code units before each code point, or None if they are equal."""
+    _starts: list[int] | None = field(default=None, init=False, repr=False)
+    _edited: bool = field(default=False, init=False, repr=False)
+    """Whether `_text` lags behind `_lines` after `apply_edits`."""
+
+    @property
+    def document(self) -> str:
+        if self._edited:
+            self._text = "".join(self._lines)
+            self._edited = False
+        return self._text
+
+    @property
+    def size(self) -> int:
+        """Approximate memory held by the reader (in characters)."""
+        return len(self.document)
 
     @cached_property
+    def _lines(self) -> Sequence[str]:
+        return self._text.splitlines(keepends=True)
+
+    @property
     def _line_starts(self) -> list[int]:
-        starts = [0]
-        for line in self._lines:
-            starts.append(starts[-1] + len(line))
-        return starts
+        if self._starts is None:
+            self._starts = [0, *accumulate(map(len, self._lines))]
+        return self._starts
+
+    def _line_units(self, line_idx: int) -> list[int] | None:
+        try:
+            return self._units[line_idx]
+        except KeyError:
+            pass
+
+        units = None
+        if 0 <= line_idx < len(self._lines):
+            line = self._lines[line_idx]
+            if not (
+                line.isascii()
+                or self.encoding == PositionEncodingKind.Utf32
+                or (
+                    self.encoding == PositionEncodingKind.Utf16
+                    and not _ASTRAL.search(line)
+                )
+            ):
+                units = [
+                    0,
+                    *accumulate(_unit_width(char, self.encoding) for char in line),
+                ]
+        self._units[line_idx] = units
+        return units
+
+    def to_column(self, position: LSPPosition) -> int:
+        """
+        Code-point index within its line of an LSP position.
+
+        Characters past the end of the line are kept as an overflow, and a
+        position inside a multi-unit character maps to the next code point.
+        """
+        if (units := self._line_units(position.line)) is None:
+            return position.character
+        if position.character > units[-1]:
+            return len(units) - 1 + position.character - units[-1]
+        return bisect_left(units, position.character)
+
+    def to_character(self, line_idx: int, column: int) -> int:
+        """LSP `character` (in code units) of a code-point index within a line."""
+        if (units := self._line_units(line_idx)) is None:
+            return column
+        if column >= len(units):
+            return units[-1] + column - (len(units) - 1)
+        return units[column]
 
     @property
     def full_range(self) -> LSPRange:
@@ -54,27 +148,32 @@ class DocumentReader:
         return LSPRange(
             start=LSPPosition(line=0, character=0),
             end=LSPPosition(
-                line=last_line_idx, character=len(self._lines[last_line_idx])
+                line=last_line_idx,
+                character=self.to_character(
+                    last_line_idx, len(self._lines[last_line_idx])
+                ),
             ),
         )
 
     def position_to_offset(self, position: LSPPosition) -> int:
         """
-        Convert a Position to a character offset.
+        Convert a Position to a code-point offset.
         """
         line_idx = max(0, min(position.line, len(self._line_starts) - 1))
-        offset = self._line_starts[line_idx] + position.character
+        offset = self._line_starts[line_idx] + self.to_column(
+            LSPPosition(line=line_idx, character=position.character)
+        )
         return min(offset, self._line_starts[-1])
 
     def offset_to_position(self, start: LSPPosition, offset: int) -> LSPPosition:
         """
         Convert a relative offset from a start position to an absolute Position.
         """
-        abs_offset = self._line_starts[start.line] + start.character + offset
+        abs_offset = self._line_starts[start.line] + self.to_column(start) + offset
         line_idx = bisect_right(self._line_starts, abs_offset) - 1
         line_idx = max(0, min(line_idx, len(self._lines) - 1))
-        char_idx = abs_offset - self._line_starts[line_idx]
-        return LSPPosition(line=line_idx, character=char_idx)
+        column = abs_offset - self._line_starts[line_idx]
+        return LSPPosition(line=line_idx, character=self.to_character(line_idx, column))
 
     def get_line(self, line_idx: int, *, keepends: bool = False) -> str | None:
         """
@@ -92,8 +191,9 @@ class DocumentReader:
         line = self.get_line(pos.line)
         if line is None:
             return None
+        column = self.to_column(pos)
         for match in re.finditer(r"\w+", line):
-            if match.start() <= pos.character < match.end():
+            if match.start() <= column < match.end():
                 return match.group()
         return None
 
@@ -105,23 +205,25 @@ class DocumentReader:
             return ""
 
         start_line = read_range.start.line
-        start_char = read_range.start.character
         end_line = min(read_range.end.line, len(self._lines))
-        end_char = read_range.end.character
 
         if start_line >= len(self._lines):
             return ""
 
-        start_offset = self._line_starts[start_line] + start_char
-        end_offset = self._line_starts[end_line]
-        if end_line < len(self._lines):
-            end_offset = self._line_starts[end_line] + end_char
-
-        end_offset = min(
-            end_offset, self._line_starts[min(end_line + 1, len(self._lines))]
+        start_char = self.to_column(read_range.start)
+        end_char = self.to_column(
+            LSPPosition(line=end_line, character=read_range.end.character)
         )
 
-        return self.document[start_offset:end_offset]
+        text = "".join(self._lines[start_line : end_line + 1])
+        end_offset = len(text)
+        if end_line < len(self._lines):
+            # The range ends on a line that is part of `text`: stop there, but
+            # never past the end of that line.
+            line_offset = len(text) - len(self._lines[end_line])
+            end_offset = min(line_offset + end_char, len(text))
+
+        return text[start_char:end_offset]
 
     def read(self, read_range: LSPRange, *, trim_empty: bool = False) -> Snippet | None:
         if not self._lines:
@@ -163,3 +265,181 @@ class DocumentReader:
         content = "".join(numbered_lines)
 
         return Snippet(content=content, exact_content=exact_content, range=read_range)
+
+    def read_many(
+        self,
+        ranges: Sequence[LSPRange],
+        *,
+        context_lines: int = 0,
+        trim_empty: bool = False,
+    ) -> list[Snippet | None]:
+        """
+        Read several ranges at once, each widened to whole lines plus
+        `context_lines` lines of context on both sides.
+
+        Overlapping or adjacent windows are merged into blocks whose lines are
+        scanned for indentation once; every snippet is then dedented on its own
+        window, exactly as `read` would do.
+        """
+        windows = [self._window(r, context_lines, trim_empty) for r in ranges]
+        snippets: list[Snippet | None] = [None] * len(ranges)
+
+        order = sorted(
+            (window, idx) for idx, window in enumerate(windows) if window is not None
+        )
+        block: list[tuple[tuple[int, int], int]] = []
+        block_end = -1
+        for window, idx in order:
+            if block and window[0] > block_end + 1:
+                self._read_block(block, block_end, snippets)
+                block = []
+            block.append((window, idx))
+            block_end = max(block_end, window[1])
+        if block:
+            self._read_block(block, block_end, snippets)
+        return snippets
+
+    def _window(
+        self, read_range: LSPRange, context_lines: int, trim_empty: bool
+    ) -> tuple[int, int] | None:
+        """First and last (inclusive) line of a range's context window."""
+        start_line = read_range.start.line
+        if not self._lines or start_line >= len(self._lines):
+            return None
+
+        end_line = read_range.end.line
+        if read_range.end.character == 0:
+            end_line = max(start_line, end_line - 1)
+        start_line = max(0, start_line - context_lines)
+        end_line = min(end_line + context_lines, len(self._lines) - 1)
+
+        if trim_empty:
+            while start_line <= end_line and not self._lines[start_line].strip():
+                start_line += 1
+            while end_line >= start_line and not self._lines[end_line].strip():
+                end_line -= 1
+        if start_line > end_line:
+            return None
+        return start_line, end_line
+
+    def _read_block(
+        self,
+        windows: list[tuple[tuple[int, int], int]],
+        block_end: int,
+        snippets: list[Snippet | None],
+    ) -> None:
+        block_start = windows[0][0][0]
+        # Per line: its leading whitespace, or None if the line is blank (as
+        # `textwrap.dedent` defines it).
+        margins: list[str | None] = []
+        for line in self._lines[block_start : block_end + 1]:
+            body = line.removesuffix("\n")
+            indent = body.lstrip(" \t")
+            margins.append(body[: len(body) - len(indent)] if indent else None)
+
+        for (start_line, end_line), idx in windows:
+            lines = range(start_line - block_start, end_line - block_start + 1)
+            width = _common_prefix_length(
+                [m for i in lines if (m := margins[i]) is not None]
+            )
+            parts: list[str] = []
+            for i in lines:
+                line = self._lines[block_start + i]
+                if margins[i] is not None:
+                    line = line[width:]
+                elif line.endswith("\n"):
+                    line = "\n"  # blank lines keep only their line break
+                else:
+                    continue
+                parts.append(f"{block_start + i + 1}| {line}")
+            read_range = LSPRange(
+                start=LSPPosition(line=start_line, character=0),
+                end=LSPPosition(line=end_line + 1, character=0),
+            )
+            snippets[idx] = Snippet(
+                content="".join(parts),
+                exact_content=self.get_text(read_range),
+                range=read_range,
+            )
+
+    def copy(self) -> "DocumentReader":
+        """
+        An independent copy of the reader, sharing no mutable state, to be
+        patched with `apply_edits` while others may still be reading this one.
+        """
+        clone = DocumentReader(self._text, self.encoding, units=dict(self._units))
+        clone._lines = list(self._lines)
+        clone._starts = None if self._starts is None else list(self._starts)
+        clone._edited = self._edited
+        return clone
+
+    def apply_edits(self, edits: Sequence[TextEdit]) -> None:
+        """
+        Apply non-overlapping `edits` (whose ranges refer to the current content)
+        in place.
+
+        Only the edited lines are split again; the index of the lines after an
+        edit is shifted rather than rebuilt.
+        """
+        lines = self._lines
+        assert isinstance(lines, list)
+        # Resolve every range against the unedited content, then apply from the
+        # end of the document so that the remaining ranges stay valid. Inserts at
+        # the same position keep their order.
+        spans = sorted(
+            (
+                (*self._clamp(e.range.start), *self._clamp(e.range.end), i, e.new_text)
+                for i, e in enumerate(edits)
+            ),
+            reverse=True,
+        )
+        for start_line, start_col, end_line, end_col, _, new_text in spans:
+            self._splice(lines, start_line, start_col, end_line, end_col, new_text)
+        if spans:
+            self._edited = True
+
+    def _clamp(self, position: LSPPosition) -> tuple[int, int]:
+        """(line, column) of a position, clamped to the document as LSP requires."""
+        lines = self._lines
+        if position.line >= len(lines):
+            if lines and not lines[-1].endswith(("\n", "\r")):
+                return len(lines) - 1, len(lines[-1])
+            return len(lines), 0
+        line = lines[position.line]
+        return position.line, min(self.to_column(position), len(line.rstrip("\r\n")))
+
+    def _splice(
+        self,
+        lines: list[str],
+        start_line: int,
+        start_col: int,
+        end_line: int,
+        end_col: int,
+        new_text: str,
+    ) -> None:
+        n = len(lines)
+        last = min(end_line, n - 1)
+        segment = new_text
+        if start_line < n:
+            segment = lines[start_line][:start_col] + segment
+        if end_line < n:
+            segment += lines[end_line][end_col:]
+        new_lines = segment.splitlines(keepends=True)
+        lines[start_line : last + 1] = new_lines
+
+        removed = max(0, last - start_line + 1)
+        shift = len(new_lines) - removed
+        self._units = {
+            k + shift if k > last else k: v
+            for k, v in self._units.items()
+            if not start_line <= k <= last
+        }
+
+        if (starts := self._starts) is not None:
+            delta = len(segment) - (starts[last + 1] - starts[start_line])
+            starts[start_line + 1 : last + 2] = accumulate(
+                map(len, new_lines), initial=starts[start_line]
+            )
+            del starts[start_line + 1]  # the initial value
+            for k in range(start_line + len(new_lines) + 1, len(starts)):
+                starts[k] += delta
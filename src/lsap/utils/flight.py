@@ -0,0 +1,68 @@
+from collections.abc import Awaitable, Callable
+from typing import cast
+
+import anyio
+from attrs import Factory, define, frozen
+
+
+@frozen
+class FlightStats:
+    issued: int
+    """Number of calls that were actually executed."""
+
+    coalesced: int
+    """Number of calls that joined an identical in-flight call instead."""
+
+
+@define
+class _Call[V]:
+    done: anyio.Event = Factory(anyio.Event)
+    result: V | None = None
+    error: Exception | None = None
+    cancelled: bool = False
+
+
+@define
+class SingleFlight[K, V]:
+    """
+    Coalesce concurrent calls sharing the same key into a single execution.
+
+    The first caller for a key executes the call; callers arriving while it is
+    still in flight wait for it and receive the same result (or exception).
+    """
+
+    issued: int = 0
+    coalesced: int = 0
+    _calls: dict[K, _Call[V]] = Factory(dict)
+
+    @property
+    def stats(self) -> FlightStats:
+        return FlightStats(issued=self.issued, coalesced=self.coalesced)
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[V]]) -> V:
+        while (call := self._calls.get(key)) is not None:
+            self.coalesced += 1
+            await call.done.wait()
+            if call.cancelled:
+                # The leader was cancelled, retry on our own behalf
+                self.coalesced -= 1
+                continue
+            if call.error is not None:
+                raise call.error
+            return cast(V, call.result)
+
+        call = _Call[V]()
+        self._calls[key] = call
+        self.issued += 1
+        try:
+            call.result = await fn()
+        except Exception as e:
+            call.error = e
+            raise
+        except BaseException:
+            call.cancelled = True
+            raise
+        finally:
+            del self._calls[key]
+            call.done.set()
+        return cast(V, call.result)
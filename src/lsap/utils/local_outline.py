@@ -0,0 +1,181 @@
+"""
+Local outline providers: document symbols computed in-process, without a
+`textDocument/documentSymbol` round-trip.
+
+A provider parses a document itself (e.g. Python sources with the stdlib `ast`
+module) and returns a `DocumentSymbol` tree shaped like the one a language
+server reports, so it can be used before the server has finished indexing.
+Capabilities fall back to the language server whenever no provider supports a
+file or the provider fails (e.g. on a syntax error, which servers tolerate).
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+from collections.abc import Iterable, Sequence
+from typing import Protocol
+
+from attrs import frozen
+from loguru import logger
+from lsp_client import Client
+from lsp_client.utils.types import AnyPath
+from lsprotocol.types import DocumentSymbol, SymbolKind
+from lsprotocol.types import Position as LSPPosition
+from lsprotocol.types import Range as LSPRange
+
+from .client import resolve_path
+from .document import DocumentReader
+from .snapshot import read_document
+
+_DEF_KEYWORD = re.compile(r"(?:async\s+)?(?:def|class)\s+")
+"""The keyword(s) a `def` / `class` statement starts with, up to its name."""
+
+
+class LocalOutlineProvider(Protocol):
+    suffixes: tuple[str, ...]
+    """File suffixes (without the dot) the provider supports."""
+
+    def document_symbols(self, reader: DocumentReader) -> list[DocumentSymbol]:
+        """The symbol tree of the document; raises if it cannot be parsed."""
+        ...
+
+
+@frozen
+class PythonOutlineProvider:
+    """Classes, functions and assigned names of Python sources, via `ast`."""
+
+    suffixes: tuple[str, ...] = ("py", "pyi")
+
+    def document_symbols(self, reader: DocumentReader) -> list[DocumentSymbol]:
+        tree = ast.parse(reader.document)
+        return list(self._symbols(reader, tree.body, in_class=False))
+
+    def _symbols(
+        self, reader: DocumentReader, body: Sequence[ast.stmt], *, in_class: bool
+    ) -> Iterable[DocumentSymbol]:
+        for node in body:
+            match node:
+                case ast.ClassDef():
+                    yield self._symbol(
+                        reader,
+                        node,
+                        node.name,
+                        SymbolKind.Class,
+                        list(self._symbols(reader, node.body, in_class=True)),
+                    )
+                case ast.FunctionDef() | ast.AsyncFunctionDef():
+                    kind = SymbolKind.Method if in_class else SymbolKind.Function
+                    yield self._symbol(reader, node, node.name, kind)
+                case ast.Assign(targets=targets):
+                    for target in targets:
+                        yield from self._names(reader, node, target)
+                case ast.AnnAssign(target=target) | ast.TypeAlias(name=target):
+                    yield from self._names(reader, node, target)
+                case (
+                    ast.If()
+                    | ast.Try()
+                    | ast.TryStar()
+                    | ast.With()
+                    | ast.For()
+                    | ast.While()
+                ):
+                    # Their bodies still belong to the enclosing scope.
+                    for block in (
+                        getattr(node, "body", []),
+                        getattr(node, "orelse", []),
+                        *(h.body for h in getattr(node, "handlers", [])),
+                        getattr(node, "finalbody", []),
+                    ):
+                        yield from self._symbols(reader, block, in_class=in_class)
+
+    def _names(
+        self, reader: DocumentReader, node: ast.stmt, target: ast.expr
+    ) -> Iterable[DocumentSymbol]:
+        match target:
+            case ast.Name(id=name):
+                kind = SymbolKind.Constant if name.isupper() else SymbolKind.Variable
+                yield self._symbol(reader, node, name, kind, selection=target)
+            case ast.Tuple(elts=elts) | ast.List(elts=elts):
+                for elt in elts:
+                    yield from self._names(reader, node, elt)
+
+    def _symbol(
+        self,
+        reader: DocumentReader,
+        node: ast.stmt,
+        name: str,
+        kind: SymbolKind,
+        children: list[DocumentSymbol] | None = None,
+        selection: ast.expr | None = None,
+    ) -> DocumentSymbol:
+        assert node.end_lineno is not None and node.end_col_offset is not None
+        if selection is not None:
+            name_line = selection.lineno - 1
+            line = reader.get_line(name_line) or ""
+            column = _column(line, selection.col_offset)
+        else:
+            # The name follows the `def` / `class` keyword on the same line.
+            name_line = node.lineno - 1
+            line = reader.get_line(name_line) or ""
+            column = _column(line, node.col_offset)
+            if keyword := _DEF_KEYWORD.match(line, column):
+                column = keyword.end()
+        selection_range = LSPRange(
+            start=LSPPosition(
+                line=name_line, character=reader.to_character(name_line, column)
+            ),
+            end=LSPPosition(
+                line=name_line,
+                character=reader.to_character(name_line, column + len(name)),
+            ),
+        )
+        return DocumentSymbol(
+            name=name,
+            kind=kind,
+            range=LSPRange(
+                start=_position(reader, node.lineno, node.col_offset),
+                end=_position(reader, node.end_lineno, node.end_col_offset),
+            ),
+            selection_range=selection_range,
+            children=children,
+        )
+
+
+def _column(line: str, byte_offset: int) -> int:
+    """Code points in the first `byte_offset` UTF-8 bytes of `line`."""
+    return len(line.encode()[:byte_offset].decode(errors="ignore"))
+
+
+def _position(reader: DocumentReader, lineno: int, byte_offset: int) -> LSPPosition:
+    """The LSP position of an `ast` (1-based line, UTF-8 byte column) location."""
+    line_idx = lineno - 1
+    column = _column(reader.get_line(line_idx) or "", byte_offset)
+    return LSPPosition(line=line_idx, character=reader.to_character(line_idx, column))
+
+
+def find_provider(
+    providers: Iterable[LocalOutlineProvider], file_path: AnyPath
+) -> LocalOutlineProvider | None:
+    suffix = str(file_path).rpartition(".")[2]
+    return next((p for p in providers if suffix in p.suffixes), None)
+
+
+async def local_document_symbols(
+    client: Client, file_path: AnyPath, providers: Iterable[LocalOutlineProvider]
+) -> list[DocumentSymbol] | None:
+    """
+    Document symbols from the first provider supporting the file, or None if
+    there is none or it failed (callers then ask the language server).
+    """
+    if (provider := find_provider(providers, file_path)) is None:
+        return None
+    try:
+        reader = await read_document(client, file_path)
+        return provider.document_symbols(reader)
+    except Exception:  # noqa: BLE001 - any provider failure falls back
+        logger.opt(exception=True).debug(
+            "Local outline of {} failed, falling back to the language server",
+            resolve_path(client, file_path),
+        )
+        return None
@@ -1,10 +1,17 @@
 """Utility functions for locate string parsing and marker detection."""
 
+import re
+from collections.abc import Iterator
+from functools import cached_property
 from pathlib import Path
 from typing import NamedTuple
 
+from attrs import Factory, define
+
 from lsap.schema.locate import LineScope, Locate, SymbolScope
 
+from .cache import CacheStats, LRUCache
+
 
 class MarkerPosition(NamedTuple):
     marker: str
@@ -12,6 +19,12 @@ class MarkerPosition(NamedTuple):
     end_pos: int
 
 
+MAX_MARKER_LEVEL = 10
+"""Reasonable maximum nesting level of a marker."""
+
+_MARKER_CANDIDATE = re.compile(r"(<*)\|(>*)")
+
+
 def detect_marker(text: str) -> MarkerPosition | None:
     """
     Detect the marker in the text using nested bracket notation.
@@ -24,30 +37,120 @@ def detect_marker(text: str) -> MarkerPosition | None:
     3. <<<|>>> (triple level)
     ... and so on
 
-    The function selects the marker with the most nesting levels that appears
+    The function selects the marker with the fewest nesting levels that appears
     exactly once in the text.
     """
-    max_level = 10  # reasonable maximum nesting level
-
-    for level in range(1, max_level + 1):
-        marker = "<" * level + "|" + ">" * level
-        count = text.count(marker)
-
-        if count == 1:
-            # Found a unique marker at this level
-            pos = text.find(marker)
+    # A `|` with `a` brackets before and `b` after is an occurrence of every
+    # level up to min(a, b); occurrences around different `|`s never overlap,
+    # so a single scan yields the same counts as `str.count` per level.
+    counts = [0] * (MAX_MARKER_LEVEL + 1)
+    first = [0] * (MAX_MARKER_LEVEL + 1)
+    for m in _MARKER_CANDIDATE.finditer(text):
+        bar = m.end(1)
+        for level in range(1, min(len(m[1]), len(m[2]), MAX_MARKER_LEVEL) + 1):
+            if not counts[level]:
+                first[level] = bar - level
+            counts[level] += 1
+
+    for level in range(1, MAX_MARKER_LEVEL + 1):
+        if counts[level] == 1:
+            marker = "<" * level + "|" + ">" * level
+            pos = first[level]
             return MarkerPosition(
                 marker=marker, start_pos=pos, end_pos=pos + len(marker)
             )
-        if count == 0:
-            # This level doesn't exist, try next
-            continue
-        # Multiple occurrences, try higher nesting level
-        continue
-
     return None
 
 
+def _to_regex(text: str) -> str:
+    """Convert search text to regex with sensible whitespace handling.
+
+    - Explicit whitespace: matches one or more whitespace (\\s+)
+    - Identifier-operator boundaries: matches zero or more whitespace (\\s*)
+    - Within tokens: literal match (no flexibility)
+    """
+    tokens = re.findall(r"\w+|[^\w\s]+|\s+", text)
+    if not tokens:
+        return ""
+
+    def parts() -> Iterator[str]:
+        for i, token in enumerate(tokens):
+            if token[0].isspace():
+                yield r"\s+"
+            else:
+                yield re.escape(token)
+                if i < len(tokens) - 1 and not tokens[i + 1][0].isspace():
+                    yield r"\s*"
+
+    return "".join(parts())
+
+
+@define
+class FindPattern:
+    """The compiled forms of a `find` string, built on first use."""
+
+    find: str
+
+    @cached_property
+    def marker(self) -> MarkerPosition | None:
+        return detect_marker(self.find)
+
+    @cached_property
+    def position(self) -> tuple[re.Pattern[str], int]:
+        """
+        Pattern locating a position, and the position's offset within a match.
+
+        With a marker, the text around it is matched literally and the position
+        is where the marker was; otherwise it is the start of the match.
+        """
+        if marker := self.marker:
+            before, _, after = self.find.partition(marker.marker)
+            return re.compile(re.escape(before) + re.escape(after)), len(before)
+        return re.compile(_to_regex(self.find)), 0
+
+    @cached_property
+    def range(self) -> re.Pattern[str] | None:
+        """Pattern matching a range, or None if `find` has no tokens."""
+        return re.compile(regex) if (regex := _to_regex(self.find)) else None
+
+
+@define
+class FindPatternCache:
+    """Compiled `find` strings, which agents tend to repeat, by string."""
+
+    capacity: int = 1024
+    hits: int = 0
+    misses: int = 0
+    _patterns: LRUCache[str, FindPattern] = Factory(
+        lambda self: LRUCache(capacity=self.capacity), takes_self=True
+    )
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(hits=self.hits, misses=self.misses)
+
+    def get(self, find: str) -> FindPattern:
+        if (pattern := self._patterns.get(find)) is not None:
+            self.hits += 1
+            return pattern
+        self.misses += 1
+        pattern = FindPattern(find)
+        self._patterns.put(find, pattern)
+        return pattern
+
+
+_find_patterns = FindPatternCache()
+
+
+def get_find_pattern(find: str) -> FindPattern:
+    """The (cached) compiled forms of a `find` string."""
+    return _find_patterns.get(find)
+
+
+def get_find_pattern_stats() -> CacheStats:
+    return _find_patterns.stats
+
+
 def parse_locate_string(locate_str: str) -> Locate:
     """
     Parse a locate string in the format: <file_path>:<scope>@<find>
@@ -0,0 +1,165 @@
+"""
+A memory-mapped `DocumentReader` backend for very large files.
+
+Instead of holding the decoded document, its lines and a `list[int]` of line
+starts, the file is mapped read-only; a compact `array('Q')` of line-start byte
+offsets is built with a single scan on first use, and only the lines that are
+actually requested are decoded.
+"""
+
+from __future__ import annotations
+
+import mmap
+import operator
+from array import array
+from collections.abc import Sequence
+from functools import cached_property
+from itertools import accumulate, islice, repeat
+from pathlib import Path
+from typing import overload, override
+
+from attrs import define, field
+from lsprotocol.types import Position as LSPPosition
+from lsprotocol.types import PositionEncodingKind, TextEdit
+
+from lsap.exception import LSAPError
+
+from .document import DocumentReader
+
+_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+_SCAN_CHUNK = 1024 * 1024
+
+
+def _line_index(data: mmap.mmap) -> array[int]:
+    """Byte offsets at which each line starts, followed by the end of the data."""
+    starts = array("Q", [0])
+    for offset in range(0, len(data), _SCAN_CHUNK):
+        lines = data[offset : offset + _SCAN_CHUNK].split(b"\n")
+        lines.pop()  # not terminated within this chunk
+        # Line starts relative to the chunk, accumulated without a Python loop.
+        ends = accumulate(map(operator.add, map(len, lines), repeat(1)), initial=offset)
+        starts.extend(islice(ends, 1, None))
+    if starts[-1] != len(data):
+        starts.append(len(data))
+    return starts
+
+
+@define
+class _MappedLines(Sequence[str]):
+    path: Path
+    data: mmap.mmap
+    starts: array[int]
+
+    def __len__(self) -> int:
+        return len(self.starts) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        # Touching pages past the end of a truncated file raises SIGBUS.
+        if self.data.size() != len(self.data):
+            raise LSAPError(f"{self.path} changed while it was being read")
+        line = self.data[self.starts[index] : self.starts[index + 1]]
+        if line.endswith(b"\r\n"):
+            # Match the newline translation of `Client.read_file`.
+            line = line[:-2] + b"\n"
+        return line.decode("utf-8", "replace")
+
+
+@define
+class MappedDocumentReader(DocumentReader):
+    """
+    A `DocumentReader` over a memory-mapped UTF-8 file.
+
+    Lines end at `\\n` or `\\r\\n` (read as `\\n`); unlike `Client.read_file`, a
+    lone `\\r` does not end a line. Accessing `document` decodes the whole file
+    and should be avoided.
+    """
+
+    _text: str = field(default="", init=False, repr=False)
+    path: Path = field(kw_only=True)
+    _data: mmap.mmap = field(kw_only=True, repr=False, alias="data")
+
+    @classmethod
+    def open(
+        cls,
+        path: Path,
+        encoding: PositionEncodingKind = PositionEncodingKind.Utf16,
+    ) -> DocumentReader:
+        """Map `path`; empty files (which cannot be mapped) are read normally."""
+        with path.open("rb") as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return DocumentReader(f.read().decode("utf-8", "replace"), encoding)
+        return cls(path=path, data=data, encoding=encoding)
+
+    @property
+    @override
+    def document(self) -> str:
+        return "".join(self._lines)
+
+    @property
+    @override
+    def size(self) -> int:
+        # The mapping itself is backed by the page cache, not by this process;
+        # what the reader holds is the line index.
+        lines = self._lines
+        assert isinstance(lines, _MappedLines)
+        return lines.starts.itemsize * len(lines.starts)
+
+    @cached_property
+    @override
+    def _lines(self) -> Sequence[str]:
+        return _MappedLines(self.path, self._data, _line_index(self._data))
+
+    def _code_points(self, end: int) -> int:
+        """Code points in the first `end` bytes, with `\r\n` read as `\n`."""
+        prefix = self._data[:end]
+        # UTF-8 continuation bytes do not start a code point.
+        return len(prefix.translate(None, _CONTINUATION_BYTES)) - prefix.count(b"\r\n")
+
+    @override
+    def position_to_offset(self, position: LSPPosition) -> int:
+        lines = self._lines
+        assert isinstance(lines, _MappedLines)
+        line_idx = max(0, min(position.line, len(lines)))
+        offset = self._code_points(lines.starts[line_idx])
+        if line_idx == len(lines):
+            return offset
+        column = self.to_column(
+            LSPPosition(line=line_idx, character=position.character)
+        )
+        if column > len(lines[line_idx]):
+            # Overflowing into the following lines, up to the end of the document.
+            return min(offset + column, self._code_points(len(self._data)))
+        return offset + column
+
+    @override
+    def offset_to_position(self, start: LSPPosition, offset: int) -> LSPPosition:
+        # Walk forward from `start` instead of keeping absolute line offsets.
+        line_idx, column = start.line, self.to_column(start) + offset
+        last = len(self._lines) - 1
+        while line_idx < last and column >= (length := len(self._lines[line_idx])):
+            column -= length
+            line_idx += 1
+        return LSPPosition(line=line_idx, character=self.to_character(line_idx, column))
+
+    @override
+    def copy(self) -> DocumentReader:
+        # Nothing can change a mapped document (see `apply_edits`).
+        return self
+
+    @override
+    def apply_edits(self, edits: Sequence[TextEdit]) -> None:
+        raise TypeError("memory-mapped documents are read-only")
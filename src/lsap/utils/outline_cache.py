@@ -0,0 +1,119 @@
+"""
+A cache of per-file directory outline groups, optionally persisted to disk.
+
+Entries are keyed by the absolute file path and its document stamp, so a file
+is only symbolized again once it has changed. Only `("stat", mtime_ns, size)`
+stamps are persisted; the LSP versions of open documents are meaningless in
+another process.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Hashable
+from pathlib import Path
+
+import anyio.to_thread
+from attrs import Factory, define, frozen
+from loguru import logger
+from pydantic import ValidationError
+
+from lsap.schema.outline import OutlineFileGroup
+
+from .cache import CacheStats, LRUCache
+
+FORMAT_VERSION = 1
+
+
+@frozen
+class _Entry:
+    stamp: Hashable
+    group: OutlineFileGroup
+
+
+def _relocated(group: OutlineFileGroup, file_path: Path) -> OutlineFileGroup:
+    """The group as produced for `file_path` (which may be spelled differently)."""
+    if group.file_path == file_path:
+        return group
+    return group.model_copy(
+        update={
+            "file_path": file_path,
+            "symbols": [
+                s.model_copy(update={"file_path": file_path}) for s in group.symbols
+            ],
+        }
+    )
+
+
+@define
+class OutlineCache:
+    store: Path | None = None
+    """JSON file the cache is loaded from and saved to, if any."""
+    capacity: int = 16384
+    hits: int = 0
+    misses: int = 0
+    _entries: LRUCache[Path, _Entry] = Factory(
+        lambda self: LRUCache(capacity=self.capacity), takes_self=True
+    )
+    _loaded: bool = False
+    _dirty: bool = False
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(hits=self.hits, misses=self.misses)
+
+    def get(self, file_path: Path, stamp: Hashable) -> OutlineFileGroup | None:
+        entry = self._entries.get(file_path.absolute())
+        if entry is not None and entry.stamp == stamp:
+            self.hits += 1
+            return _relocated(entry.group, file_path)
+        self.misses += 1
+        return None
+
+    def put(self, file_path: Path, stamp: Hashable, group: OutlineFileGroup) -> None:
+        self._entries.put(file_path.absolute(), _Entry(stamp=stamp, group=group))
+        self._dirty = True
+
+    async def load(self) -> None:
+        """Read the store once; a missing or unreadable store is ignored."""
+        if self._loaded or self.store is None:
+            return
+        self._loaded = True
+        await anyio.to_thread.run_sync(self._load_sync, self.store)
+
+    async def save(self) -> None:
+        if self.store is None or not self._dirty:
+            return
+        self._dirty = False
+        await anyio.to_thread.run_sync(self._save_sync, self.store)
+
+    def _load_sync(self, store: Path) -> None:
+        try:
+            data = json.loads(store.read_text())
+            if data.get("version") != FORMAT_VERSION:
+                return
+            for raw in data["entries"]:
+                group = OutlineFileGroup.model_validate(raw["group"])
+                stamp = ("stat", raw["mtime_ns"], raw["size"])
+                self._entries.put(Path(raw["path"]), _Entry(stamp=stamp, group=group))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError, ValidationError) as e:
+            logger.warning("Ignoring unreadable outline cache {}: {}", store, e)
+
+    def _save_sync(self, store: Path) -> None:
+        entries = [
+            {
+                "path": str(path),
+                "mtime_ns": entry.stamp[1],
+                "size": entry.stamp[2],
+                "group": entry.group.model_dump(mode="json"),
+            }
+            for path, entry in self._entries.items()
+            if isinstance(entry.stamp, tuple) and entry.stamp[0] == "stat"
+        ]
+        store.parent.mkdir(parents=True, exist_ok=True)
+        tmp = store.with_name(f"{store.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": FORMAT_VERSION, "entries": entries}))
+        tmp.replace(store)
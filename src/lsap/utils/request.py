@@ -0,0 +1,211 @@
+"""
+Shared LSP request helpers used by all capabilities.
+
+Requests issued through these helpers are coalesced per client: concurrent
+identical requests (same method and parameters) share a single round-trip to
+the language server. Document symbols and hovers are additionally cached per
+document snapshot, so that Locate, Outline, Inspect, Reference and Definition reuse each
+other's results for as long as the document is unchanged.
+"""
+
+import json
+from collections.abc import Hashable, Sequence
+from pathlib import Path
+from typing import Any
+
+from attrs import Factory, define, frozen
+from lsp_client import Client
+from lsp_client.capability.request import WithRequestDocumentSymbol, WithRequestHover
+from lsp_client.capability.request.workspace_symbol import (
+    WithRequestWorkspaceSymbolResolve,
+)
+from lsp_client.utils.types import AnyPath, lsp_type
+from lsp_client.utils.workspace_edit import AnyTextEdit
+
+from .cache import CacheStats, LRUCache
+from .capability import ensure_capability
+from .client import ClientLocal, resolve_path
+from .flight import FlightStats, SingleFlight
+from .snapshot import document_stamp, get_document_cache
+from .symbol import SymbolIndex
+from .workspace_index import get_workspace_index
+
+_flights: ClientLocal[SingleFlight[Hashable, Any]] = ClientLocal(SingleFlight)
+
+
+def get_request_stats(client: Client) -> FlightStats:
+    """Counters of issued vs. coalesced requests for the given client."""
+    return _flights.get(client).stats
+
+
+@frozen
+class _SymbolSnapshot:
+    stamp: Hashable
+    index: SymbolIndex
+
+
+@define
+class SymbolCache:
+    """Document symbols of recently used documents, keyed by document stamp."""
+
+    capacity: int = 256
+    hits: int = 0
+    misses: int = 0
+    _snapshots: LRUCache[Path, _SymbolSnapshot] = Factory(
+        lambda self: LRUCache(capacity=self.capacity), takes_self=True
+    )
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(hits=self.hits, misses=self.misses)
+
+    def get(self, path: Path, stamp: Hashable) -> SymbolIndex | None:
+        if (snapshot := self._snapshots.get(path)) and snapshot.stamp == stamp:
+            self.hits += 1
+            return snapshot.index
+        self.misses += 1
+        return None
+
+    def put(self, path: Path, stamp: Hashable, index: SymbolIndex) -> None:
+        self._snapshots.put(path, _SymbolSnapshot(stamp=stamp, index=index))
+
+    def invalidate(self, path: Path) -> None:
+        self._snapshots.pop(path)
+
+
+_symbol_caches: ClientLocal[SymbolCache] = ClientLocal(SymbolCache)
+
+
+def get_symbol_cache(client: Client) -> SymbolCache:
+    return _symbol_caches.get(client)
+
+
+def invalidate_document(client: Client, file_path: AnyPath) -> None:
+    """Drop every cached snapshot of a document, e.g. after it has been edited."""
+    path = resolve_path(client, file_path)
+    get_document_cache(client).invalidate(path)
+    get_symbol_cache(client).invalidate(path)
+
+
+def update_document(
+    client: Client, file_path: AnyPath, edits: Sequence[AnyTextEdit]
+) -> None:
+    """
+    Like `invalidate_document`, but keep the document snapshot warm by patching
+    it with the `edits` that were just written.
+    """
+    path = resolve_path(client, file_path)
+    get_document_cache(client).update(client, path, edits)
+    get_symbol_cache(client).invalidate(path)
+
+
+async def request_symbol_index(
+    client: Client, file_path: AnyPath
+) -> SymbolIndex | None:
+    """
+    `textDocument/documentSymbol` wrapped in a position index.
+
+    Served from the symbol cache while the document is unchanged, otherwise
+    coalesced with identical in-flight requests.
+    """
+    cap = ensure_capability(client, WithRequestDocumentSymbol)
+    cache = get_symbol_cache(client)
+    path = resolve_path(client, file_path)
+    stamp = document_stamp(client, path)
+    if stamp is not None and (index := cache.get(path, stamp)):
+        return index
+
+    async def fetch() -> SymbolIndex | None:
+        if (symbols := await cap.request_document_symbol_list(file_path)) is None:
+            return None
+        index = SymbolIndex(symbols)
+        if stamp is not None:
+            cache.put(path, stamp, index)
+        get_workspace_index(client).update(path, stamp, index.symbols)
+        return index
+
+    key = (lsp_type.TEXT_DOCUMENT_DOCUMENT_SYMBOL, path, stamp)
+    return await _flights.get(client).do(key, fetch)
+
+
+async def request_document_symbols(
+    client: Client, file_path: AnyPath
+) -> Sequence[lsp_type.DocumentSymbol] | None:
+    """`textDocument/documentSymbol`, cached and coalesced."""
+    if index := await request_symbol_index(client, file_path):
+        return index.symbols
+    return None
+
+
+type _HoverKey = tuple[Path, Hashable, int, int]
+
+# Hovers are wrapped in a tuple so that "no hover" can be cached as well.
+_hovers: ClientLocal[LRUCache[_HoverKey, tuple[lsp_type.MarkupContent | None]]] = (
+    ClientLocal(lambda: LRUCache(capacity=4096))
+)
+
+
+async def request_hover(
+    client: Client, file_path: AnyPath, position: lsp_type.Position
+) -> lsp_type.MarkupContent | None:
+    """
+    `textDocument/hover`, coalesced with identical in-flight requests.
+
+    Results are memoized by position for as long as the document is unchanged.
+    """
+    cap = ensure_capability(client, WithRequestHover)
+    path = resolve_path(client, file_path)
+    stamp = document_stamp(client, path)
+    key = (path, stamp, position.line, position.character)
+    hovers = _hovers.get(client)
+    if stamp is not None and (cached := hovers.get(key)) is not None:
+        return cached[0]
+
+    async def fetch() -> lsp_type.MarkupContent | None:
+        result = await cap.request_hover(file_path, position)
+        if stamp is not None:
+            hovers.put(key, (result,))
+        return result
+
+    return await _flights.get(client).do((lsp_type.TEXT_DOCUMENT_HOVER, *key), fetch)
+
+
+type _SymbolKey = tuple[str, str, int, str | None, str, Hashable]
+
+_resolved_symbols: ClientLocal[LRUCache[_SymbolKey, lsp_type.WorkspaceSymbol]] = (
+    ClientLocal(lambda: LRUCache(capacity=4096))
+)
+
+
+async def request_workspace_symbol_resolve(
+    client: Client, symbol: lsp_type.WorkspaceSymbol
+) -> lsp_type.WorkspaceSymbol:
+    """
+    `workspaceSymbol/resolve`, coalesced with identical in-flight requests.
+
+    Results are memoized by symbol identity (URI, name, kind, container and the
+    server's `data`) for as long as the symbol's document is unchanged. Symbols
+    without `data` cannot be told apart from same-named symbols of the same
+    file (their location has no range), so they are always resolved on their own.
+    """
+    cap = ensure_capability(client, WithRequestWorkspaceSymbolResolve)
+    if symbol.data is None:
+        return await cap.request_workspace_symbol_resolve(symbol)
+
+    uri = symbol.location.uri
+    stamp = document_stamp(client, client.from_uri(uri, relative=False))
+    data = json.dumps(symbol.data, sort_keys=True)
+    key = (uri, symbol.name, symbol.kind, symbol.container_name, data, stamp)
+    resolved = _resolved_symbols.get(client)
+    if stamp is not None and (cached := resolved.get(key)) is not None:
+        return cached
+
+    async def fetch() -> lsp_type.WorkspaceSymbol:
+        result = await cap.request_workspace_symbol_resolve(symbol)
+        if stamp is not None:
+            resolved.put(key, result)
+        return result
+
+    return await _flights.get(client).do(
+        (lsp_type.WORKSPACE_SYMBOL_RESOLVE, *key), fetch
+    )
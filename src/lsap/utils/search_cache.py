@@ -0,0 +1,109 @@
+"""
+Reuse of recent `workspace/symbol` results for refined queries.
+
+Agents often refine a search step by step (`User`, `UserRepo`,
+`UserRepository`). Whatever the server's fuzzy matching rules, every symbol
+matching a query also matches any query it is a substring of, so the results of
+a refinement are found among the cached results of the broader query and can be
+filtered locally instead of asking the server again.
+
+This only holds for plain identifier queries: servers match queries such as
+`User.save` or `ns::func` against container-qualified names, and some support
+query syntax (e.g. rust-analyzer's `#` and `*` modifiers), so such queries are
+always sent to the server.
+"""
+
+import re
+import time
+from collections.abc import Sequence
+
+from attrs import Factory, define, frozen
+from lsp_client import Client
+from lsprotocol.types import WorkspaceSymbol
+
+from .cache import CacheStats, LRUCache
+from .client import ClientLocal
+from .workspace_index import fuzzy_pattern
+
+_IDENTIFIER = re.compile(r"\w+")
+
+
+@frozen
+class SearchCacheStats(CacheStats):
+    refinements: int = 0
+    """Hits served by filtering the results of a broader query."""
+
+    @property
+    def refinement_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.refinements / total if total else 0.0
+
+
+@frozen
+class _Results:
+    created: float
+    symbols: Sequence[WorkspaceSymbol]
+
+
+@define
+class SearchResultCache:
+    """Recent `workspace/symbol` results by query, expiring after `ttl` seconds."""
+
+    capacity: int = 32
+    ttl: float = 30.0
+    max_results: int = 100
+    """Result sets at least this large may have been truncated by the server,
+    so they are not refined."""
+    hits: int = 0
+    refinements: int = 0
+    misses: int = 0
+    _results: LRUCache[str, _Results] = Factory(
+        lambda self: LRUCache(capacity=self.capacity), takes_self=True
+    )
+
+    @property
+    def stats(self) -> SearchCacheStats:
+        return SearchCacheStats(
+            hits=self.hits, misses=self.misses, refinements=self.refinements
+        )
+
+    def get(self, query: str) -> Sequence[WorkspaceSymbol] | None:
+        now = time.monotonic()
+        if (exact := self._results.get(query)) and now - exact.created < self.ttl:
+            self.hits += 1
+            return exact.symbols
+
+        # The longest cached query that the new one refines.
+        needle = query.lower()
+        base: tuple[str, _Results] | None = None
+        refinable = _IDENTIFIER.fullmatch(query) is not None
+        for cached, results in self._results.items() if refinable else ():
+            if (
+                _IDENTIFIER.fullmatch(cached)
+                and now - results.created < self.ttl
+                and len(results.symbols) < self.max_results
+                and cached.lower() in needle
+                and (base is None or len(cached) > len(base[0]))
+            ):
+                base = (cached, results)
+        if base is None:
+            self.misses += 1
+            return None
+
+        pattern = fuzzy_pattern(query)
+        symbols = [s for s in base[1].symbols if pattern.search(s.name.lower())]
+        # Expires together with the results it was derived from.
+        self._results.put(query, _Results(created=base[1].created, symbols=symbols))
+        self.hits += 1
+        self.refinements += 1
+        return symbols
+
+    def put(self, query: str, symbols: Sequence[WorkspaceSymbol]) -> None:
+        self._results.put(query, _Results(created=time.monotonic(), symbols=symbols))
+
+
+_caches: ClientLocal[SearchResultCache] = ClientLocal(SearchResultCache)
+
+
+def get_search_cache(client: Client) -> SearchResultCache:
+    return _caches.get(client)
@@ -1,10 +1,18 @@
+from collections import deque
 from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager
+from types import TracebackType
+from typing import Any
 
 import anyio
+from attrs import Factory, define, field
+from lsp_client import Client
+
+from .client import ClientLocal
 
 
 def with_sem[**P, R](
-    sem: anyio.Semaphore,
+    sem: AbstractAsyncContextManager[Any],
     func: Callable[P, Awaitable[R]],
     *args: P.args,
     **kwargs: P.kwargs,
@@ -14,3 +22,137 @@ def with_sem[**P, R](
             return await func(*args, **kwargs)
 
     return wrapper
+
+
+@define
+class AdaptiveLimiter:
+    """
+    A concurrency limiter whose limit adapts to the language server (AIMD).
+
+    Every completed slot within `latency_target` raises the limit additively
+    (by about one per "round" of `limit` completions); a slot that fails or is
+    slower than `latency_target` multiplies the limit by `backoff`, at most once
+    per `latency_target` interval. The limit always stays within
+    [`floor`, `ceiling`].
+
+    Usable as a drop-in replacement for `anyio.Semaphore` (`async with limiter:`).
+    """
+
+    floor: int = 4
+    ceiling: int = 64
+    initial: int = 32
+    latency_target: float = 2.0
+    """Slot duration (in seconds) above which the server is considered overloaded."""
+    backoff: float = 0.7
+
+    _limit: float = field(init=False)
+    _in_flight: int = field(default=0, init=False)
+    _last_decrease: float = field(default=float("-inf"), init=False)
+    _waiters: deque[anyio.Event] = Factory(deque)
+    _started: dict[int, list[float]] = Factory(dict)
+
+    def __attrs_post_init__(self) -> None:
+        self._limit = float(min(max(self.initial, self.floor), self.ceiling))
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        while self._in_flight >= self.limit:
+            event = anyio.Event()
+            self._waiters.append(event)
+            try:
+                await event.wait()
+            except BaseException:
+                if event.is_set():
+                    # Pass the wake-up on to the next waiter
+                    self._wake()
+                else:
+                    self._waiters.remove(event)
+                raise
+        self._in_flight += 1
+
+    def release(self, latency: float, *, error: bool = False) -> None:
+        self._in_flight -= 1
+        now = anyio.current_time()
+        if error or latency > self.latency_target:
+            if now - self._last_decrease >= self.latency_target:
+                self._limit = max(float(self.floor), self._limit * self.backoff)
+                self._last_decrease = now
+        else:
+            self._limit = min(float(self.ceiling), self._limit + 1 / self._limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        free = self.limit - self._in_flight
+        while free > 0 and self._waiters:
+            self._waiters.popleft().set()
+            free -= 1
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+        task_id = anyio.get_current_task().id
+        self._started.setdefault(task_id, []).append(anyio.current_time())
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        task_id = anyio.get_current_task().id
+        started = self._started[task_id].pop()
+        if not self._started[task_id]:
+            del self._started[task_id]
+        self.release(
+            anyio.current_time() - started,
+            error=isinstance(exc, Exception),
+        )
+
+
+_limiters: ClientLocal[AdaptiveLimiter] = ClientLocal(AdaptiveLimiter)
+
+
+def get_limiter(client: Client) -> AdaptiveLimiter:
+    """The concurrency limiter shared by all capabilities of a client."""
+    return _limiters.get(client)
+
+
+def set_limiter(client: Client, limiter: AdaptiveLimiter) -> None:
+    """
+    Use `limiter` for all capabilities of a client from now on.
+
+    Slots already acquired are released to the limiter they were acquired from.
+    """
+    _limiters.set(client, limiter)
+
+
+def configure_limiter(
+    client: Client,
+    *,
+    floor: int | None = None,
+    ceiling: int | None = None,
+    initial: int | None = None,
+    latency_target: float | None = None,
+    backoff: float | None = None,
+) -> AdaptiveLimiter:
+    """
+    Replace the limiter of a client with a new `AdaptiveLimiter`; options that
+    are not given keep their defaults. E.g. `configure_limiter(client, floor=1,
+    ceiling=8)` for a language server that handles little concurrency.
+    """
+    options = {
+        "floor": floor,
+        "ceiling": ceiling,
+        "initial": initial,
+        "latency_target": latency_target,
+        "backoff": backoff,
+    }
+    limiter = AdaptiveLimiter(**{k: v for k, v in options.items() if v is not None})
+    set_limiter(client, limiter)
+    return limiter
@@ -0,0 +1,176 @@
+"""
+Shared, version-aware document snapshots.
+
+Capabilities read the same handful of files over and over. Instead of
+re-reading and re-indexing them on every request, indexed `DocumentReader`
+instances are cached per client and reused for as long as the underlying
+document is unchanged.
+"""
+
+import time
+from collections.abc import Hashable, Sequence
+from pathlib import Path
+
+from attrs import Factory, define, frozen
+from lsp_client import Client
+from lsp_client.protocol import CapabilityClientProtocol
+from lsp_client.utils.types import AnyPath, lsp_type
+from lsp_client.utils.workspace_edit import AnyTextEdit, get_edit_text
+
+from .cache import SizedLRUCache
+from .client import ClientLocal, position_encoding, resolve_path
+from .document import DocumentReader
+from .flight import SingleFlight
+from .mapped import MappedDocumentReader
+
+RACY_WINDOW_NS = 2_000_000_000
+"""Files modified more recently than this are not cached, since a second
+write within the filesystem timestamp granularity would go unnoticed."""
+
+MAPPED_MIN_SIZE = 4 * 1024 * 1024
+"""Files (that are not open in the client) from this size on are memory-mapped
+instead of being read into memory."""
+
+
+@frozen
+class _Snapshot:
+    stamp: Hashable
+    reader: DocumentReader
+
+
+@frozen
+class SnapshotStats:
+    hits: int
+    misses: int
+    size: int
+    """Approximate memory held by the cached documents (see `DocumentReader.size`)."""
+
+
+def document_stamp(client: Client, path: Path) -> Hashable | None:
+    """
+    A value that changes whenever the content of the document may have changed.
+
+    Open documents are identified by their LSP version, other files by their
+    mtime and size. Returns None if the document cannot be safely identified.
+    """
+    uri = path.as_uri() if path.is_absolute() else None
+    if uri is not None:
+        state = client.get_document_state()
+        if (version := state.get_version(uri)) is not None:
+            return ("version", version, id(state.get_content(uri)))
+
+    if (stamp := _stat_stamp(path)) is None:
+        return None
+    if time.time_ns() - stamp[1] < RACY_WINDOW_NS:
+        return None
+    return stamp
+
+
+def _stat_stamp(path: Path) -> tuple[str, int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return ("stat", stat.st_mtime_ns, stat.st_size)
+
+
+@define
+class DocumentCache:
+    """A byte-bounded LRU of indexed document snapshots."""
+
+    max_size: int = 64 * 1024 * 1024
+    hits: int = 0
+    misses: int = 0
+    _snapshots: SizedLRUCache[Path, _Snapshot] = Factory(
+        lambda self: SizedLRUCache(
+            max_size=self.max_size, sizeof=lambda s: s.reader.size
+        ),
+        takes_self=True,
+    )
+    _flight: SingleFlight[Hashable, DocumentReader] = Factory(SingleFlight)
+
+    @property
+    def stats(self) -> SnapshotStats:
+        return SnapshotStats(
+            hits=self.hits, misses=self.misses, size=self._snapshots.size
+        )
+
+    def get(self, path: Path, stamp: Hashable) -> DocumentReader | None:
+        if (snapshot := self._snapshots.get(path)) and snapshot.stamp == stamp:
+            self.hits += 1
+            return snapshot.reader
+        self.misses += 1
+        return None
+
+    def put(self, path: Path, stamp: Hashable, reader: DocumentReader) -> None:
+        self._snapshots.put(path, _Snapshot(stamp=stamp, reader=reader))
+
+    def invalidate(self, path: Path) -> None:
+        self._snapshots.pop(path)
+
+    def update(self, client: Client, path: Path, edits: Sequence[AnyTextEdit]) -> None:
+        """
+        Patch the cached snapshot of `path` after `edits` have been written to it.
+
+        The snapshot must still reflect the content the edits were computed
+        against. A patched copy replaces it only if the result matches what the
+        client wrote (the tracked content, or the file size); otherwise it is
+        dropped. Readers already handed out are left untouched.
+        """
+        snapshot = self._snapshots.pop(path)
+        if snapshot is None or isinstance(snapshot.reader, MappedDocumentReader):
+            return
+
+        reader = snapshot.reader.copy()
+        reader.apply_edits(
+            [lsp_type.TextEdit(range=e.range, new_text=get_edit_text(e)) for e in edits]
+        )
+        # Unlike `document_stamp`, accept a file that was modified just now: it
+        # was written by the client, and the snapshot is only served once the
+        # racy window has passed and the stamps still agree.
+        match document_stamp(client, path) or _stat_stamp(path):
+            case ("version", _, _) as stamp:
+                content = client.get_document_state().get_content(path.as_uri())
+                matches = content == reader.document
+            case ("stat", _, int(size)) as stamp:
+                matches = size == len(reader.document.encode())
+            case _:
+                return
+        if matches:
+            self.put(path, stamp, reader)
+
+    async def read(self, client: Client, file_path: AnyPath) -> DocumentReader:
+        """Read a document through the client, reusing a cached snapshot if valid."""
+        encoding = position_encoding(client)
+        if not isinstance(client, CapabilityClientProtocol):
+            return DocumentReader(await client.read_file(file_path), encoding)
+
+        path = resolve_path(client, file_path)
+        if (stamp := document_stamp(client, path)) is None:
+            return DocumentReader(await client.read_file(file_path), encoding)
+
+        if reader := self.get(path, stamp):
+            return reader
+
+        async def fetch() -> DocumentReader:
+            match stamp:
+                case ("stat", _, int(size)) if size >= MAPPED_MIN_SIZE:
+                    reader = MappedDocumentReader.open(path, encoding)
+                case _:
+                    reader = DocumentReader(await client.read_file(file_path), encoding)
+            self.put(path, stamp, reader)
+            return reader
+
+        return await self._flight.do((path, stamp), fetch)
+
+
+_caches: ClientLocal[DocumentCache] = ClientLocal(DocumentCache)
+
+
+def get_document_cache(client: Client) -> DocumentCache:
+    return _caches.get(client)
+
+
+async def read_document(client: Client, file_path: AnyPath) -> DocumentReader:
+    """Read a document as an indexed `DocumentReader`, shared across capabilities."""
+    return await get_document_cache(client).read(client, file_path)
@@ -1,5 +1,10 @@
+from __future__ import annotations
+
+from bisect import bisect_right
 from collections.abc import Iterator, Sequence
+from functools import cached_property
 
+from attrs import Factory, define
 from lsprotocol.types import DocumentSymbol
 from lsprotocol.types import Position as LSPPosition
 from lsprotocol.types import Range as LSPRange
@@ -44,3 +49,113 @@ def symbol_at(
         ):
             best_match = (path, symbol)
     return best_match
+
+
+@define
+class _Node:
+    path: SymbolPath
+    symbol: DocumentSymbol
+    start: tuple[int, int]
+    end: tuple[int, int]
+    order: int
+    children: _Level = Factory(lambda: _Level())
+
+    def contains(self, pos: tuple[int, int]) -> bool:
+        return self.start <= pos < self.end
+
+
+@define
+class _Level:
+    """Siblings of the containment tree, sorted by start position."""
+
+    nodes: list[_Node] = Factory(list)
+    starts: list[tuple[int, int]] = Factory(list)
+    disjoint: bool = True
+
+    def append(self, node: _Node) -> None:
+        if self.nodes and self.nodes[-1].end > node.start:
+            self.disjoint = False
+        self.nodes.append(node)
+        self.starts.append(node.start)
+
+    def containing(self, pos: tuple[int, int]) -> Iterator[_Node]:
+        """The nodes of this level and below containing `pos`."""
+        idx = bisect_right(self.starts, pos) - 1
+        if idx < 0:
+            return
+        # Overlapping siblings: any candidate starting before `pos` may contain it.
+        candidates = [self.nodes[idx]] if self.disjoint else self.nodes[: idx + 1]
+        for node in candidates:
+            if node.contains(pos):
+                yield node
+                yield from node.children.containing(pos)
+
+
+@define
+class SymbolIndex:
+    """
+    Position and path index over a DocumentSymbol tree.
+
+    Symbols are arranged into a containment tree by their ranges (independent of
+    the hierarchy reported by the server) so that the innermost symbol containing
+    a position is found with a binary search per nesting level. Symbol paths are
+    hashed so that resolving a `SymbolScope` is a dict lookup.
+    """
+
+    symbols: Sequence[DocumentSymbol]
+
+    @cached_property
+    def entries(self) -> list[tuple[SymbolPath, DocumentSymbol]]:
+        """All symbols with their paths, in DFS order."""
+        return list(iter_symbols(self.symbols))
+
+    @cached_property
+    def _by_path(
+        self,
+    ) -> dict[tuple[str, ...], list[tuple[SymbolPath, DocumentSymbol]]]:
+        by_path: dict[tuple[str, ...], list[tuple[SymbolPath, DocumentSymbol]]] = {}
+        for path, symbol in self.entries:
+            by_path.setdefault(tuple(path), []).append((path, symbol))
+        return by_path
+
+    @cached_property
+    def _roots(self) -> _Level:
+        nodes = [
+            _Node(
+                path=path,
+                symbol=symbol,
+                start=_pos(symbol.range.start),
+                end=_pos(symbol.range.end),
+                order=order,
+            )
+            for order, (path, symbol) in enumerate(self.entries)
+        ]
+        # Outer ranges first for equal starts; ties keep DFS order so that the
+        # later (deeper) symbol ends up nested and wins, as in `symbol_at`.
+        nodes.sort(key=lambda n: (n.start, -n.end[0], -n.end[1]))
+
+        roots = _Level()
+        stack: list[_Node] = []
+        for node in nodes:
+            while stack and stack[-1].end < node.end:
+                stack.pop()
+            (stack[-1].children if stack else roots).append(node)
+            stack.append(node)
+        return roots
+
+    def symbol_at(
+        self, position: LSPPosition
+    ) -> tuple[SymbolPath, DocumentSymbol] | None:
+        """Find the most specific DocumentSymbol containing the given position."""
+        pos = _pos(position)
+        best: _Node | None = None
+        # Children lie within their parent, so only the containing nodes are
+        # visited; they are then picked in DFS order exactly as `symbol_at` does.
+        for node in sorted(self._roots.containing(pos), key=lambda n: n.order):
+            if best is None or (node.start >= best.start and node.end <= best.end):
+                best = node
+        return (best.path, best.symbol) if best else None
+
+    def find(self, path: SymbolPath) -> list[tuple[SymbolPath, DocumentSymbol]]:
+        """All symbols with exactly the given path (several for overloads), in DFS order."""
+        return self._by_path.get(tuple(path), [])
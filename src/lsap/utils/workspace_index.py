@@ -0,0 +1,206 @@
+"""
+An in-process index of workspace symbols, built from `documentSymbol` results.
+
+Every document symbol list requested through `lsap.utils.request` is added to
+the index of its client. Once the index has been filled with the whole
+workspace (see `SearchCapability.index_workspace`), searches are answered from
+it instead of `workspace/symbol`, whose speed and matching rules vary by server.
+
+Names are matched case-insensitively: names containing the query are found
+through a trigram index, other names are matched when the query is a
+subsequence of them (e.g. `gcfg` matches `get_config`). Subsequence candidates
+are narrowed down to the names containing every character of the query, so no
+search scans the whole index.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from collections.abc import Hashable, Iterable, Sequence
+from pathlib import Path
+
+from attrs import Factory, define, frozen
+from lsp_client import Client
+from lsprotocol.types import DocumentSymbol, Location, WorkspaceSymbol
+
+from lsap.schema.models import SymbolKind
+
+from .client import ClientLocal
+from .snapshot import document_stamp
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def fuzzy_pattern(query: str) -> re.Pattern[str]:
+    """Matches lower-cased names that contain `query` as a subsequence."""
+    return re.compile(".*?".join(map(re.escape, query.lower())))
+
+
+def _flatten(
+    uri: str, nodes: Sequence[DocumentSymbol], container: str | None = None
+) -> Iterable[WorkspaceSymbol]:
+    for node in nodes:
+        yield WorkspaceSymbol(
+            name=node.name,
+            kind=node.kind,
+            location=Location(uri=uri, range=node.selection_range),
+            container_name=container,
+        )
+        if node.children:
+            yield from _flatten(uri, node.children, node.name)
+
+
+@frozen
+class _IndexedFile:
+    stamp: Hashable | None
+    symbols: list[WorkspaceSymbol]
+
+
+@define
+class WorkspaceSymbolIndex:
+    ready: bool = False
+    """Whether the index covers the whole workspace and can answer searches."""
+    check_interval: float = 5.0
+    """Seconds between checks of the whole index for changed files (see
+    `check_due`); the files of search results are checked on every search."""
+
+    _files: dict[Path, _IndexedFile] = Factory(dict)
+    _by_name: dict[str, dict[Path, list[WorkspaceSymbol]]] = Factory(dict)
+    """Symbols by lower-cased name, then by file."""
+    _trigrams: dict[str, set[str]] = Factory(dict)
+    """Lower-cased names by the trigrams they contain."""
+    _chars: dict[str, set[str]] = Factory(dict)
+    """Lower-cased names by the characters they contain."""
+    _checked_at: float = float("-inf")
+
+    def __len__(self) -> int:
+        return sum(len(f.symbols) for f in self._files.values())
+
+    def update(
+        self,
+        path: Path,
+        stamp: Hashable | None,
+        symbols: Sequence[DocumentSymbol],
+    ) -> None:
+        """(Re-)index the document symbols of `path` at the given stamp."""
+        self.remove(path)
+        indexed = list(_flatten(path.as_uri(), symbols))
+        self._files[path] = _IndexedFile(stamp=stamp, symbols=indexed)
+        for symbol in indexed:
+            name = symbol.name.lower()
+            if name not in self._by_name:
+                self._by_name[name] = {}
+                for trigram in _trigrams(name):
+                    self._trigrams.setdefault(trigram, set()).add(name)
+                for char in set(name):
+                    self._chars.setdefault(char, set()).add(name)
+            self._by_name[name].setdefault(path, []).append(symbol)
+
+    def remove(self, path: Path) -> None:
+        if (indexed := self._files.pop(path, None)) is None:
+            return
+        for name in {s.name.lower() for s in indexed.symbols}:
+            files = self._by_name[name]
+            del files[path]
+            if files:
+                continue
+            del self._by_name[name]
+            for postings, keys in (
+                (self._trigrams, _trigrams(name)),
+                (self._chars, set(name)),
+            ):
+                for key in keys:
+                    names = postings[key]
+                    names.discard(name)
+                    if not names:
+                        del postings[key]
+
+    @property
+    def check_due(self) -> bool:
+        """Whether the whole index should be checked for changes again."""
+        return time.monotonic() - self._checked_at >= self.check_interval
+
+    def stale(self, client: Client, paths: Iterable[Path] | None = None) -> list[Path]:
+        """
+        Indexed files (among `paths`, by default all of them) that may have
+        changed since they were indexed.
+        """
+        if paths is None:
+            self._checked_at = time.monotonic()
+            paths = self._files
+        return [
+            path
+            for path in paths
+            if (indexed := self._files.get(path)) is not None
+            and (indexed.stamp is None or document_stamp(client, path) != indexed.stamp)
+        ]
+
+    def search(
+        self, query: str, kinds: Iterable[SymbolKind] | None = None
+    ) -> list[WorkspaceSymbol]:
+        """
+        Symbols whose name matches `query`, best matches first.
+
+        Exact matches rank before prefix matches, then substring matches, then
+        subsequence matches; ties are broken by name length, file and position.
+        """
+        query = query.lower()
+        kind_set = set(kinds) if kinds else None
+
+        substring = self._substring_matches(query)
+        pattern = fuzzy_pattern(query)
+        subsequence = {
+            name
+            for name in self._containing_chars(query) - substring
+            if pattern.search(name)
+        }
+        ranked: list[tuple[tuple[int, int, str, int, int], WorkspaceSymbol]] = []
+        for name in substring | subsequence:
+            if name in substring:
+                rank = 0 if name == query else 1 if name.startswith(query) else 2
+            else:
+                rank = 3
+            for path, symbols in self._by_name[name].items():
+                for symbol in symbols:
+                    if kind_set and SymbolKind.from_lsp(symbol.kind) not in kind_set:
+                        continue
+                    assert isinstance(symbol.location, Location)
+                    start = symbol.location.range.start
+                    key = (rank, len(name), str(path), start.line, start.character)
+                    ranked.append((key, symbol))
+        ranked.sort(key=lambda entry: entry[0])
+        return [symbol for _, symbol in ranked]
+
+    def _containing_chars(self, query: str) -> set[str]:
+        """Names containing every character of `query` (all names if empty)."""
+        if not query:
+            return set(self._by_name)
+        candidates: set[str] | None = None
+        for names in sorted((self._chars.get(c, set()) for c in set(query)), key=len):
+            candidates = names & candidates if candidates is not None else set(names)
+            if not candidates:
+                break
+        return candidates or set()
+
+    def _substring_matches(self, query: str) -> set[str]:
+        if len(query) < 3:
+            return {name for name in self._containing_chars(query) if query in name}
+        candidates: set[str] | None = None
+        # Intersect the rarest posting lists first.
+        for names in sorted(
+            (self._trigrams.get(t, set()) for t in _trigrams(query)), key=len
+        ):
+            candidates = names & candidates if candidates is not None else set(names)
+            if not candidates:
+                return set()
+        return {name for name in candidates or () if query in name}
+
+
+_indexes: ClientLocal[WorkspaceSymbolIndex] = ClientLocal(WorkspaceSymbolIndex)
+
+
+def get_workspace_index(client: Client) -> WorkspaceSymbolIndex:
+    return _indexes.get(client)
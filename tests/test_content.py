@@ -1,4 +1,5 @@
-from lsprotocol.types import Position, Range
+import pytest
+from lsprotocol.types import Position, PositionEncodingKind, Range, TextEdit
 
 from lsap.utils.document import DocumentReader
 
@@ -145,3 +146,153 @@ def test_read_trim_empty_only_whitespace():
 
     result = reader.read(read_range, trim_empty=True)
     assert result is None
+
+
+def test_utf16_positions_after_astral_characters():
+    # "😀" is two UTF-16 code units, "名" is one.
+    content = 'x = "😀名" + name\nnext'
+    reader = DocumentReader(document=content)
+    start = Position(line=0, character=12)
+    read_range = Range(start=start, end=Position(line=0, character=16))
+
+    assert reader.get_text(read_range) == "name"
+    assert reader.word_at(start) == "name"
+    assert reader.position_to_offset(start) == 11
+    assert reader.offset_to_position(Position(line=0, character=0), 11) == start
+    assert reader.offset_to_position(start, 5) == Position(line=1, character=0)
+    assert reader.full_range.end == Position(line=1, character=4)
+
+
+@pytest.mark.parametrize(
+    ("encoding", "character"),
+    [
+        (PositionEncodingKind.Utf8, 10),  # é is 2 bytes, 😀 is 4
+        (PositionEncodingKind.Utf16, 7),
+        (PositionEncodingKind.Utf32, 6),
+    ],
+)
+def test_position_encodings(encoding, character):
+    reader = DocumentReader(document="é😀 = 'value'\n", encoding=encoding)
+    pos = Position(line=0, character=character)
+
+    assert reader.to_column(pos) == 6
+    assert reader.to_character(0, 6) == character
+    assert reader.get_text(Range(start=pos, end=Position(line=0, character=99))) == (
+        "value'\n"
+    )
+
+
+def test_bmp_lines_are_not_indexed_for_utf16():
+    reader = DocumentReader(document="名前 = 1\n😀\nplain\n")
+    assert reader.to_column(Position(line=0, character=3)) == 3
+    assert reader.to_column(Position(line=2, character=2)) == 2
+    assert reader._units == {0: None, 2: None}
+
+    assert reader.to_column(Position(line=1, character=2)) == 1
+    assert reader._units[1] == [0, 2, 3]
+
+
+def test_position_inside_surrogate_pair_maps_to_next_character():
+    reader = DocumentReader(document="😀a")
+    assert reader.to_column(Position(line=0, character=1)) == 1
+    assert reader.word_at(Position(line=0, character=2)) == "a"
+
+
+def _context_range(read_range, context_lines):
+    return Range(
+        start=Position(line=max(0, read_range.start.line - context_lines), character=0),
+        end=Position(line=read_range.end.line + context_lines + 1, character=0),
+    )
+
+
+def test_read_many_matches_read_per_range():
+    content = (
+        "class A:\n"
+        "    def foo(self):\n"
+        "        x = 1\n"
+        "\n"
+        "        return x\n"
+        "\n"
+        "\n"
+        "def bar():\n"
+        "\tpass\n"
+    )
+    reader = DocumentReader(document=content)
+    ranges = [
+        Range(start=Position(line=4, character=8), end=Position(line=4, character=14)),
+        Range(start=Position(line=2, character=8), end=Position(line=2, character=9)),
+        Range(start=Position(line=8, character=1), end=Position(line=8, character=5)),
+        Range(start=Position(line=1, character=8), end=Position(line=1, character=11)),
+    ]
+
+    for context_lines in (0, 1, 3):
+        snippets = reader.read_many(
+            ranges, context_lines=context_lines, trim_empty=True
+        )
+        for read_range, snippet in zip(ranges, snippets, strict=True):
+            expected = reader.read(
+                _context_range(read_range, context_lines), trim_empty=True
+            )
+            assert snippet is not None and expected is not None
+            assert snippet.content == expected.content
+            assert snippet.range == expected.range
+
+
+def test_read_many_out_of_bounds_and_empty():
+    reader = DocumentReader(document="a\n\nb\n")
+    out_of_bounds = Range(
+        start=Position(line=9, character=0), end=Position(line=9, character=1)
+    )
+    blank = Range(
+        start=Position(line=1, character=0), end=Position(line=1, character=0)
+    )
+
+    snippets = reader.read_many([out_of_bounds, blank], trim_empty=True)
+    assert snippets == [None, None]
+    assert DocumentReader(document="").read_many([blank]) == [None]
+
+
+def _edit(start_line, start_char, end_line, end_char, new_text):
+    return TextEdit(
+        range=Range(
+            start=Position(line=start_line, character=start_char),
+            end=Position(line=end_line, character=end_char),
+        ),
+        new_text=new_text,
+    )
+
+
+def test_apply_edits_matches_fresh_reader():
+    reader = DocumentReader(document="def f😀(a):\n    return a\n\nf😀(1)\nend")
+    reader.position_to_offset(Position(line=3, character=0))  # build the index
+    reader.apply_edits(
+        [
+            _edit(3, 0, 3, 3, "g"),
+            _edit(0, 4, 0, 7, "g"),
+            _edit(1, 12, 2, 0, "\n    # done\n"),
+            _edit(4, 3, 4, 3, "!"),
+            _edit(4, 3, 4, 3, "\n"),
+            _edit(9, 0, 9, 0, "tail"),
+        ]
+    )
+
+    expected = "def g(a):\n    return a\n    # done\n\ng(1)\nend!\ntail"
+    fresh = DocumentReader(document=expected)
+    assert reader.document == expected
+    for line in range(7):
+        position = Position(line=line, character=2)
+        assert reader.position_to_offset(position) == fresh.position_to_offset(position)
+        assert reader.get_line(line) == fresh.get_line(line)
+    assert reader.full_range == fresh.full_range
+
+
+def test_copy_is_patched_independently():
+    reader = DocumentReader(document="a😀 = 1\nb = a😀\n")
+    offset = reader.position_to_offset(Position(line=1, character=4))
+    copy = reader.copy()
+    copy.apply_edits([_edit(0, 0, 0, 3, "value"), _edit(1, 4, 1, 7, "value")])
+
+    assert copy.document == "value = 1\nb = value\n"
+    assert reader.document == "a😀 = 1\nb = a😀\n"
+    assert reader.get_line(0) == "a😀 = 1"
+    assert reader.position_to_offset(Position(line=1, character=4)) == offset
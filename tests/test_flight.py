@@ -0,0 +1,70 @@
+import anyio
+import pytest
+
+from lsap.utils.flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_calls():
+    flight: SingleFlight[str, int] = SingleFlight()
+    calls = 0
+    results: list[int] = []
+
+    async def fetch() -> int:
+        nonlocal calls
+        calls += 1
+        await anyio.sleep(0.01)
+        return 42
+
+    async def run() -> None:
+        results.append(await flight.do("key", fetch))
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(8):
+            tg.start_soon(run)
+
+    assert results == [42] * 8
+    assert calls == 1
+    assert flight.stats.issued == 1
+    assert flight.stats.coalesced == 7
+
+
+@pytest.mark.asyncio
+async def test_single_flight_distinct_keys_and_sequential_calls():
+    flight: SingleFlight[str, str] = SingleFlight()
+
+    async def fetch_a() -> str:
+        return "a"
+
+    async def fetch_b() -> str:
+        return "b"
+
+    assert await flight.do("a", fetch_a) == "a"
+    assert await flight.do("b", fetch_b) == "b"
+    # Completed calls are not cached
+    assert await flight.do("a", fetch_a) == "a"
+    assert flight.stats.issued == 3
+    assert flight.stats.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_single_flight_propagates_errors():
+    flight: SingleFlight[str, int] = SingleFlight()
+    errors: list[Exception] = []
+
+    async def fetch() -> int:
+        await anyio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run() -> None:
+        try:
+            await flight.do("key", fetch)
+        except ValueError as e:
+            errors.append(e)
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(3):
+            tg.start_soon(run)
+
+    assert len(errors) == 3
+    assert flight.stats.issued == 1
@@ -1,6 +1,7 @@
 from contextlib import asynccontextmanager
 from pathlib import Path
 
+import anyio
 import pytest
 from lsp_client.capability.request import (
     WithRequestCallHierarchy,
@@ -230,6 +231,34 @@ async def test_inspect_from_text():
     assert "def foo(self):" in resp.info.code
 
 
+@pytest.mark.asyncio
+async def test_inspect_call_hierarchy_partial_on_timeout():
+    class SlowOutgoingClient(MockInspectClient):
+        async def request_call_hierarchy_outgoing_call(self, file_path, position):
+            await anyio.sleep(5)
+            return await super().request_call_hierarchy_outgoing_call(
+                file_path, position
+            )
+
+    client = SlowOutgoingClient()
+    capability = InspectCapability(client=client, section_timeout=0.05)  # type: ignore
+
+    req = InspectRequest(
+        locate=Locate(
+            file_path=Path("test.py"),
+            scope=SymbolScope(symbol_path=SymbolPath([Symbol("A"), Symbol("foo")])),
+        )
+    )
+
+    with anyio.fail_after(2):
+        resp = await capability(req)
+    assert resp is not None
+    assert resp.info.path == ["A", "foo"]
+    assert resp.call_hierarchy is not None
+    assert [item.name for item in resp.call_hierarchy.incoming] == ["caller"]
+    assert resp.call_hierarchy.outgoing == []
+
+
 def test_iter_symbols():
     foo_symbol = DocumentSymbol(
         name="foo",
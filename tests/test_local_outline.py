@@ -0,0 +1,101 @@
+from lsprotocol.types import PositionEncodingKind, SymbolKind
+
+from lsap.utils.document import DocumentReader
+from lsap.utils.local_outline import PythonOutlineProvider, find_provider
+
+SOURCE = '''\
+"""Module."""
+import os
+
+MAX = 3
+name: str = "名前😀"
+a, b = 1, 2
+
+if os.name == "nt":
+    def windows(): ...
+else:
+    def posix(): ...
+
+
+class A:
+    x: int = 1
+
+    @property
+    def foo(self):
+        def inner(): ...
+        return 1
+
+    class B:
+        async def bar(self): ...
+
+
+def ünïcode(): pass
+'''
+
+
+def outline(source: str, encoding=PositionEncodingKind.Utf16):
+    reader = DocumentReader(source, encoding)
+    return PythonOutlineProvider().document_symbols(reader)
+
+
+def test_python_outline_tree():
+    symbols = outline(SOURCE)
+    assert [(s.name, s.kind) for s in symbols] == [
+        ("MAX", SymbolKind.Constant),
+        ("name", SymbolKind.Variable),
+        ("a", SymbolKind.Variable),
+        ("b", SymbolKind.Variable),
+        ("windows", SymbolKind.Function),
+        ("posix", SymbolKind.Function),
+        ("A", SymbolKind.Class),
+        ("ünïcode", SymbolKind.Function),
+    ]
+    cls = symbols[6]
+    assert [(s.name, s.kind) for s in cls.children or []] == [
+        ("x", SymbolKind.Variable),
+        ("foo", SymbolKind.Method),
+        ("B", SymbolKind.Class),
+    ]
+    foo = cls.children[1]  # type: ignore[index]
+    assert foo.children is None
+    assert (foo.range.start.line, foo.range.end.line) == (17, 19)
+    assert (foo.selection_range.start.line, foo.selection_range.start.character) == (
+        17,
+        8,
+    )
+    bar = cls.children[2].children[0]  # type: ignore[index]
+    assert (bar.name, bar.kind) == ("bar", SymbolKind.Method)
+    assert (cls.range.start.line, cls.range.end.line) == (13, 22)
+
+
+def test_python_outline_positions_use_the_position_encoding():
+    source = 'x = "😀"; y = 1\n'
+    assert outline(source)[1].selection_range.start.character == 10
+    utf8 = outline(source, PositionEncodingKind.Utf8)
+    assert utf8[1].selection_range.start.character == 12
+    assert utf8[1].range.end.character == 17
+
+
+def test_python_outline_selection_skips_the_keyword():
+    source = (
+        "def f():\n"
+        "    pass\n"
+        "class s:\n"
+        "    def e(self):\n"
+        "        pass\n"
+        "async def a():\n"
+        "    pass\n"
+    )
+    f, s, a = outline(source)
+    assert f.selection_range.start.character == 4
+    assert s.selection_range.start.character == 6
+    assert s.children[0].selection_range.start.character == 8
+    assert a.selection_range.start.character == 10
+    assert a.selection_range.end.character == 11
+
+
+def test_find_provider():
+    provider = PythonOutlineProvider()
+    assert find_provider([provider], "pkg/mod.py") is provider
+    assert find_provider([provider], "stub.pyi") is provider
+    assert find_provider([provider], "main.ts") is None
@@ -11,7 +11,11 @@ from lsap.schema.locate import (
 )
 
 # Import from the utils module
-from lsap.utils.locate import detect_marker, parse_locate_string
+from lsap.utils.locate import (
+    FindPatternCache,
+    detect_marker,
+    parse_locate_string,
+)
 
 
 class TestMarkerDetection:
@@ -69,6 +73,12 @@ class TestMarkerDetection:
         assert marker == "<|>"
         assert text[start:end] == "<|>"
 
+    def test_nested_marker_contains_lower_levels(self):
+        """Test that <<|>> also counts as an occurrence of <|>."""
+        assert detect_marker("a <<|>> b") == ("<|>", 3, 6)
+        assert detect_marker("a <|> b <<|>> c") == ("<<|>>", 8, 13)
+        assert detect_marker("a <<|>> b <<|>> c") is None
+
 
 class TestLocateValidation:
     """Test the validation of Locate objects with auto-detected markers."""
@@ -224,3 +234,33 @@ class TestParseLocateString:
         assert locate.scope.start_line == 10
         assert locate.scope.end_line == 0
         assert locate.find is None
+
+
+class TestFindPatternCache:
+    """Test the cache of compiled find strings."""
+
+    def test_patterns_are_compiled_once(self):
+        cache = FindPatternCache(capacity=2)
+        pattern = cache.get("self.<|>value")
+        assert cache.get("self.<|>value") is pattern
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+        cache.get("a")
+        cache.get("b")
+        assert cache.get("self.<|>value") is not pattern
+        assert cache.stats.misses == 4
+
+    def test_position_and_range_patterns(self):
+        cache = FindPatternCache()
+        marked = cache.get("self.<|>value")
+        regex, offset = marked.position
+        m = regex.search("x = self.value")
+        assert m is not None and m.start() + offset == 9
+
+        plain = cache.get("def  process(")
+        regex, offset = plain.position
+        assert offset == 0
+        assert regex.search("def process (x)") is not None
+        assert plain.range is not None
+        assert plain.range.search("def\tprocess(") is not None
+        assert cache.get("").range is None
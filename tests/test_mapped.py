@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+from lsprotocol.types import Position, Range
+
+from lsap.exception import LSAPError
+from lsap.utils.document import DocumentReader
+from lsap.utils.mapped import MappedDocumentReader
+
+CONTENT = 'class A:\r\n    name = "名前😀"\r\n\r\n    def f(self):\n        return 1\n'
+
+
+def _ranges():
+    for start_line in range(6):
+        for end_line in range(start_line, 7):
+            for character in (0, 3, 11, 40):
+                yield Range(
+                    start=Position(line=start_line, character=character),
+                    end=Position(line=end_line, character=character),
+                )
+
+
+def test_mapped_reader_matches_in_memory_reader(tmp_path: Path):
+    path = tmp_path / "big.py"
+    path.write_bytes(CONTENT.encode())
+    mapped = MappedDocumentReader.open(path)
+    reader = DocumentReader(path.read_text())
+
+    assert isinstance(mapped, MappedDocumentReader)
+    assert mapped.document == reader.document
+    assert mapped.full_range == reader.full_range
+    for read_range in _ranges():
+        assert mapped.get_text(read_range) == reader.get_text(read_range)
+        assert mapped.read(read_range) == reader.read(read_range)
+        start = read_range.start
+        assert mapped.word_at(start) == reader.word_at(start)
+        if start.line < 5:
+            assert mapped.position_to_offset(start) == reader.position_to_offset(start)
+            assert mapped.offset_to_position(start, 7) == reader.offset_to_position(
+                start, 7
+            )
+
+
+def test_mapped_reader_detects_truncation(tmp_path: Path):
+    path = tmp_path / "big.py"
+    path.write_text("a = 1\nb = 2\n")
+    mapped = MappedDocumentReader.open(path)
+    assert mapped.get_line(1) == "b = 2"
+
+    path.write_text("")
+    with pytest.raises(LSAPError):
+        mapped.get_line(1)
+
+
+def test_empty_file_is_read_in_memory(tmp_path: Path):
+    path = tmp_path / "empty.py"
+    path.write_text("")
+    reader = MappedDocumentReader.open(path)
+    assert type(reader) is DocumentReader
+    assert reader.document == ""
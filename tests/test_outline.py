@@ -1,7 +1,10 @@
+import os
 import tempfile
+import time
 from contextlib import asynccontextmanager
 from pathlib import Path
 
+import anyio
 import pytest
 from lsp_client.capability.request import (
     WithRequestDocumentSymbol,
@@ -12,12 +15,19 @@ from lsp_client.protocol import CapabilityClientProtocol
 from lsp_client.protocol.lang import LanguageConfig
 from lsp_client.utils.config import ConfigurationMap
 from lsp_client.utils.workspace import WORKSPACE_ROOT_DIR, Workspace, WorkspaceFolder
-from lsprotocol.types import DocumentSymbol, LanguageKind, SymbolKind
+from lsprotocol.types import (
+    DocumentSymbol,
+    LanguageKind,
+    MarkupContent,
+    MarkupKind,
+    SymbolKind,
+)
 from lsprotocol.types import Position as LSPPosition
 from lsprotocol.types import Range as LSPRange
 
 from lsap.capability.outline import OutlineCapability
 from lsap.schema.outline import OutlineRequest, SymbolScope
+from lsap.utils.local_outline import PythonOutlineProvider
 
 
 class MockOutlineClient(
@@ -814,3 +824,237 @@ async def test_outline_glob_excludes_directories():
         file_names = {group.file_path.name for group in resp.files}
         assert file_names == {"file.py"}
         assert "dir.py" not in file_names
+
+
+@pytest.mark.asyncio
+async def test_outline_directory_cache(tmp_path: Path):
+    class CountingClient(MockOutlineClient):
+        def __init__(self):
+            super().__init__()
+            self.requested: list[str] = []
+
+        async def request_document_symbol_list(self, file_path):
+            self.requested.append(Path(file_path).name)
+            return await super().request_document_symbol_list(file_path)
+
+    def write(name: str, content: str, age: float) -> None:
+        path = tmp_path / name
+        path.write_text(content)
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+
+    write("a.py", "class A: ...\n", age=20)
+    write("b.py", "class B: ...\n", age=20)
+    store = tmp_path / ".lsap" / "outline.json"
+    req = OutlineRequest(path=tmp_path, recursive=True)
+
+    client = CountingClient()
+    capability = OutlineCapability(client=client, cache_file=store)  # type: ignore
+    first = await capability(req)
+    assert first is not None
+    assert sorted(client.requested) == ["a.py", "b.py"]
+    assert store.exists()
+
+    write("b.py", "class B:\n    x = 1\n", age=10)
+    second = await capability(req)
+    assert second is not None
+    assert sorted(client.requested) == ["a.py", "b.py", "b.py"]
+
+    # A new capability (e.g. in another process) starts from the store.
+    client = CountingClient()
+    capability = OutlineCapability(client=client, cache_file=store)  # type: ignore
+    third = await capability(req)
+    assert third is not None
+    assert client.requested == []
+    assert third.total_symbols == first.total_symbols
+    assert {g.file_path for g in third.files} == {tmp_path / "a.py", tmp_path / "b.py"}
+
+
+@pytest.mark.asyncio
+async def test_outline_stream_directory_is_ordered_and_bounded(tmp_path: Path):
+    names = [f"m{i:02}.py" for i in range(12)]
+
+    class SlowClient(MockOutlineClient):
+        def __init__(self):
+            super().__init__()
+            self.started = 0
+
+        async def request_document_symbol_list(self, file_path):
+            self.started += 1
+            # Later files finish first.
+            await anyio.sleep(0.001 * (len(names) - names.index(file_path.name)))
+            return await super().request_document_symbol_list(file_path)
+
+    for name in names:
+        (tmp_path / name).write_text("")
+    client = SlowClient()
+    capability = OutlineCapability(client=client)  # type: ignore
+    req = OutlineRequest(path=tmp_path)
+
+    streamed = []
+    async for group in capability.stream_directory(req, max_buffered=3):
+        assert client.started <= len(streamed) + 1 + 3
+        streamed.append(group)
+    assert [group.file_path.name for group in streamed] == names
+
+    resp = await capability(req)
+    assert resp is not None and resp.files is not None
+    assert [group.file_path.name for group in resp.files] == names
+    assert streamed[0].format().startswith("\n## `")
+
+
+@pytest.mark.asyncio
+async def test_outline_directory_budgets_resume_from_cursor(tmp_path: Path):
+    names = [f"m{i}.py" for i in range(5)]
+
+    class SlowClient(MockOutlineClient):
+        delay = 0.0
+
+        async def request_document_symbol_list(self, file_path):
+            if file_path.name != names[0]:
+                await anyio.sleep(self.delay)
+            return await super().request_document_symbol_list(file_path)
+
+    for name in names:
+        (tmp_path / name).write_text("")
+    client = SlowClient()
+    capability = OutlineCapability(client=client)  # type: ignore
+
+    first = await capability(OutlineRequest(path=tmp_path, max_files=2))
+    assert first is not None and first.files is not None
+    assert [g.file_path.name for g in first.files] == names[:2]
+    assert first.truncated_by == "max_files"
+    assert first.cursor == str(tmp_path / "m2.py")
+    assert f'cursor="{first.cursor}"' in first.format()
+
+    rest = await capability(
+        OutlineRequest(path=tmp_path, max_symbols=2, cursor=first.cursor)
+    )
+    assert rest is not None and rest.files is not None
+    assert [g.file_path.name for g in rest.files] == names[2:4]
+    assert rest.truncated_by == "max_symbols"
+    assert rest.cursor == str(tmp_path / "m4.py")
+
+    last = await capability(OutlineRequest(path=tmp_path, cursor=rest.cursor))
+    assert last is not None and last.files is not None
+    assert [g.file_path.name for g in last.files] == names[4:]
+    assert last.cursor is None and last.truncated_by is None
+
+    client.delay = 10
+    capability = OutlineCapability(client=client)  # type: ignore
+    with anyio.fail_after(5):
+        timed = await capability(OutlineRequest(path=tmp_path, time_budget=0.1))
+    assert timed is not None and timed.files is not None
+    assert [g.file_path.name for g in timed.files] == names[:1]
+    assert timed.truncated_by == "time_budget"
+    assert timed.cursor == str(tmp_path / "m1.py")
+
+    with pytest.raises(ValueError):
+        OutlineRequest(path=tmp_path, max_files=0)
+
+
+@pytest.mark.asyncio
+async def test_outline_hover_modes_and_cache(tmp_path: Path):
+    def symbol(name, kind, line, detail=None, children=None):
+        return DocumentSymbol(
+            name=name,
+            kind=kind,
+            detail=detail,
+            range=LSPRange(
+                start=LSPPosition(line=line, character=0),
+                end=LSPPosition(line=line, character=10),
+            ),
+            selection_range=LSPRange(
+                start=LSPPosition(line=line, character=4),
+                end=LSPPosition(line=line, character=7),
+            ),
+            children=children,
+        )
+
+    class HoverClient(MockOutlineClient):
+        def __init__(self):
+            super().__init__()
+            self.hovered: list[int] = []
+
+        async def request_hover(self, file_path, position):
+            self.hovered.append(position.line)
+            return MarkupContent(kind=MarkupKind.Markdown, value=f"doc {position.line}")
+
+        async def request_document_symbol_list(self, file_path):
+            return [
+                symbol(
+                    "A",
+                    SymbolKind.Class,
+                    0,
+                    children=[
+                        symbol("x", SymbolKind.Field, 1, detail="int"),
+                        symbol("y", SymbolKind.Field, 2),
+                        symbol("foo", SymbolKind.Method, 3),
+                    ],
+                )
+            ]
+
+    path = tmp_path / "a.py"
+    path.write_text("")
+    mtime = time.time() - 20
+    os.utime(path, (mtime, mtime))
+
+    client = HoverClient()
+    capability = OutlineCapability(client=client)  # type: ignore
+
+    resp = await capability(OutlineRequest(path=path, recursive=True, hover="none"))
+    assert resp is not None and resp.items is not None
+    assert client.hovered == []
+    assert all(item.hover is None for item in resp.items)
+
+    resp = await capability(
+        OutlineRequest(path=path, recursive=True, hover="top-level")
+    )
+    assert resp is not None and resp.items is not None
+    assert client.hovered == [0]
+    assert [item.hover for item in resp.items] == ["doc 0", None, None, None]
+
+    resp = await capability(OutlineRequest(path=path, recursive=True))
+    assert resp is not None and resp.items is not None
+    # `x` is described by its detail; `A` is served from the hover cache.
+    assert sorted(client.hovered) == [0, 2, 3]
+    assert [item.hover for item in resp.items] == ["doc 0", None, "doc 2", "doc 3"]
+
+
+@pytest.mark.asyncio
+async def test_outline_local_provider_with_lsp_fallback(tmp_path: Path):
+    class DiskClient(MockOutlineClient):
+        def __init__(self):
+            super().__init__()
+            self.requested: list[str] = []
+
+        async def read_file(self, file_path) -> str:
+            return Path(file_path).read_text()
+
+        async def request_document_symbol_list(self, file_path):
+            self.requested.append(Path(file_path).name)
+            return await super().request_document_symbol_list(file_path)
+
+    (tmp_path / "a.py").write_text("class Local:\n    def m(self): ...\n")
+    (tmp_path / "broken.py").write_text("class (:\n")
+    client = DiskClient()
+    capability = OutlineCapability(
+        client=client,  # type: ignore
+        local_providers=[PythonOutlineProvider()],
+    )
+
+    resp = await capability(OutlineRequest(path=tmp_path))
+    assert resp is not None and resp.files is not None
+    assert [[s.name for s in g.symbols] for g in resp.files] == [["Local"], ["A"]]
+    assert client.requested == ["broken.py"]
+
+    resp = await capability(
+        OutlineRequest(
+            path=tmp_path / "a.py",
+            scope=SymbolScope(symbol_path=["Local"]),
+            recursive=True,
+        )
+    )
+    assert resp is not None and resp.items is not None
+    assert [item.path for item in resp.items] == [["Local"], ["Local", "m"]]
+    assert client.requested == ["broken.py"]
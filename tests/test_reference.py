@@ -1,6 +1,9 @@
-from contextlib import asynccontextmanager
+import os
+import time
+from contextlib import aclosing, asynccontextmanager
 from pathlib import Path
 
+import anyio
 import pytest
 from lsp_client.capability.request import (
     WithRequestDocumentSymbol,
@@ -223,3 +226,233 @@ async def test_unsupported_implementation():
     resp = await capability(req)
     # If there's no response, that's fine - it just means no implementations were found
     assert resp is None or isinstance(resp, object)
+
+
+def _aged(path: Path, content: str, age: float) -> Path:
+    """Write `path` with an mtime outside the racy window, so it gets a stamp."""
+    path.write_text(content)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.mark.asyncio
+async def test_reference_enriches_only_requested_page(tmp_path: Path):
+    path = _aged(tmp_path / "test.py", "", age=20)
+
+    class CountingClient(MockReferenceClient):
+        def __init__(self):
+            super().__init__()
+            self.hover_calls = 0
+
+        async def request_hover(self, file_path, position):
+            self.hover_calls += 1
+            return None
+
+        async def request_references(
+            self, file_path, position, *, include_declaration: bool = True
+        ):
+            return [
+                Location(
+                    uri=path.as_uri(),
+                    range=LSPRange(
+                        start=LSPPosition(line=1, character=8 + i),
+                        end=LSPPosition(line=1, character=11 + i),
+                    ),
+                )
+                for i in range(50)
+            ]
+
+    client = CountingClient()
+    capability = ReferenceCapability(client=client)  # type: ignore
+
+    locate = Locate(
+        file_path=path,
+        scope=LineScope(start_line=2, end_line=3),
+        find="foo",
+    )
+    resp = await capability(ReferenceRequest(locate=locate, max_items=5))
+    assert resp is not None
+    assert resp.total == 50
+    assert len(resp.items) == 5
+    assert client.hover_calls == 5
+
+    # Revisiting the same page reuses the memoized items
+    resp = await capability(
+        ReferenceRequest(locate=locate, pagination_id=resp.pagination_id, max_items=5)
+    )
+    assert resp is not None
+    assert len(resp.items) == 5
+    assert client.hover_calls == 5
+
+
+@pytest.mark.asyncio
+async def test_reference_items_are_not_reused_after_an_edit(tmp_path: Path):
+    path = _aged(tmp_path / "test.py", "a.foo()\nb.foo()\n", age=20)
+
+    class DiskClient(MockReferenceClient):
+        async def read_file(self, file_path) -> str:
+            return Path(file_path).read_text()
+
+        async def request_references(
+            self, file_path, position, *, include_declaration: bool = True
+        ):
+            return [
+                Location(
+                    uri=path.as_uri(),
+                    range=LSPRange(
+                        start=LSPPosition(line=1, character=2),
+                        end=LSPPosition(line=1, character=5),
+                    ),
+                )
+            ]
+
+    capability = ReferenceCapability(client=DiskClient())  # type: ignore
+    req = ReferenceRequest(locate=Locate(file_path=path, find="foo"))
+    resp = await capability(req)
+    assert resp is not None
+    assert "b.foo()" in resp.items[0].code
+
+    _aged(path, "a.foo()\nc.foo()\n", age=10)
+    resp = await capability(req)
+    assert resp is not None
+    assert "c.foo()" in resp.items[0].code
+
+
+@pytest.mark.asyncio
+async def test_reference_groups_enrichment_by_file():
+    class CountingClient(MockReferenceClient):
+        def __init__(self):
+            super().__init__()
+            self.read_calls = 0
+            self.symbol_calls = 0
+
+        async def read_file(self, file_path) -> str:
+            self.read_calls += 1
+            return await super().read_file(file_path)
+
+        async def request_document_symbol_list(self, file_path):
+            self.symbol_calls += 1
+            return await super().request_document_symbol_list(file_path)
+
+        async def request_references(
+            self, file_path, position, *, include_declaration: bool = True
+        ):
+            return [
+                Location(
+                    uri=uri,
+                    range=LSPRange(
+                        start=LSPPosition(line=1, character=8 + i),
+                        end=LSPPosition(line=1, character=11 + i),
+                    ),
+                )
+                for uri in ("file://a.py", "file://b.py")
+                for i in range(10)
+            ]
+
+    client = CountingClient()
+    capability = ReferenceCapability(client=client)  # type: ignore
+
+    resp = await capability(
+        ReferenceRequest(
+            locate=Locate(
+                file_path=Path("test.py"),
+                scope=LineScope(start_line=2, end_line=3),
+                find="foo",
+            )
+        )
+    )
+    assert resp is not None
+    assert len(resp.items) == 20
+    assert [item.location.file_path.name for item in resp.items[:10]] == ["a.py"] * 10
+    # One read for locate plus one per referenced file
+    assert client.read_calls == 3
+    assert client.symbol_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_reference_stream_yields_files_in_order():
+    class SlowFirstFileClient(MockReferenceClient):
+        async def read_file(self, file_path) -> str:
+            if Path(file_path).name == "a.py":
+                await anyio.sleep(0.05)
+            return await super().read_file(file_path)
+
+        async def request_references(
+            self, file_path, position, *, include_declaration: bool = True
+        ):
+            return [
+                Location(
+                    uri=f"file://{name}",
+                    range=LSPRange(
+                        start=LSPPosition(line=line, character=0),
+                        end=LSPPosition(line=line, character=1),
+                    ),
+                )
+                for name in ("b.py", "a.py")
+                for line in (5, 1)
+            ]
+
+    capability = ReferenceCapability(client=SlowFirstFileClient())  # type: ignore
+    req = ReferenceRequest(
+        locate=Locate(
+            file_path=Path("test.py"),
+            scope=LineScope(start_line=2, end_line=3),
+            find="foo",
+        )
+    )
+
+    groups = [group async for group in capability.stream(req)]
+    assert [group.file_path.name for group in groups] == ["a.py", "b.py"]
+    assert [item.location.range.start.line for item in groups[0].items] == [2, 6]
+
+    resp = await capability(req)
+    assert resp is not None
+    assert [item for group in groups for item in group.items] == resp.items
+    assert "### `a.py:2`" in groups[0].format()
+
+
+@pytest.mark.asyncio
+async def test_reference_stream_closes_early():
+    class SlowLastFileClient(MockReferenceClient):
+        cancelled = False
+
+        async def read_file(self, file_path) -> str:
+            if Path(file_path).name == "b.py":
+                try:
+                    await anyio.sleep(10)
+                except anyio.get_cancelled_exc_class():
+                    self.cancelled = True
+                    raise
+            return await super().read_file(file_path)
+
+        async def request_references(
+            self, file_path, position, *, include_declaration: bool = True
+        ):
+            return [
+                Location(
+                    uri=f"file://{name}",
+                    range=LSPRange(
+                        start=LSPPosition(line=1, character=0),
+                        end=LSPPosition(line=1, character=1),
+                    ),
+                )
+                for name in ("a.py", "b.py")
+            ]
+
+    client = SlowLastFileClient()
+    capability = ReferenceCapability(client=client)  # type: ignore
+    req = ReferenceRequest(
+        locate=Locate(
+            file_path=Path("test.py"),
+            scope=LineScope(start_line=2, end_line=3),
+            find="foo",
+        )
+    )
+
+    with anyio.fail_after(5):
+        async with aclosing(capability.stream(req)) as stream:
+            async for group in stream:
+                assert group.file_path.name == "a.py"
+                break
+    assert client.cancelled
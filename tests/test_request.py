@@ -0,0 +1,132 @@
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import anyio
+import pytest
+from lsp_client.capability.request import WithRequestDocumentSymbol
+from lsp_client.client.document_state import DocumentStateManager
+from lsp_client.protocol import CapabilityClientProtocol
+from lsp_client.protocol.lang import LanguageConfig
+from lsp_client.utils.config import ConfigurationMap
+from lsprotocol.types import DocumentSymbol, LanguageKind, SymbolKind
+from lsprotocol.types import Position as LSPPosition
+from lsprotocol.types import Range as LSPRange
+
+from lsap.utils.request import (
+    get_request_stats,
+    get_symbol_cache,
+    invalidate_document,
+    request_document_symbols,
+    request_symbol_index,
+)
+
+
+class SymbolClient(WithRequestDocumentSymbol, CapabilityClientProtocol):
+    def __init__(self):
+        self.symbol_calls = 0
+        self._doc_state = DocumentStateManager()
+        self._config_map = ConfigurationMap()
+
+    def as_uri(self, file_path) -> str:
+        return Path(file_path).absolute().as_uri()
+
+    def from_uri(self, uri: str, *, relative: bool = True) -> Path:
+        return Path(uri.removeprefix("file://"))
+
+    def get_workspace(self):
+        return {}
+
+    def get_config_map(self) -> ConfigurationMap:
+        return self._config_map
+
+    def get_document_state(self) -> DocumentStateManager:
+        return self._doc_state
+
+    @classmethod
+    def get_language_config(cls):
+        return LanguageConfig(
+            kind=LanguageKind.Python,
+            suffixes=["py"],
+            project_files=["pyproject.toml"],
+        )
+
+    async def request(self, req, schema):
+        return None
+
+    async def notify(self, msg):
+        pass
+
+    async def read_file(self, file_path) -> str:
+        return Path(file_path).read_text()
+
+    async def write_file(self, uri: str, content: str) -> None:
+        pass
+
+    @asynccontextmanager
+    async def open_files(self, *file_paths):
+        yield
+
+    async def request_document_symbol_list(self, file_path) -> list[DocumentSymbol]:
+        self.symbol_calls += 1
+        await anyio.sleep(0.01)
+        return [
+            DocumentSymbol(
+                name="foo",
+                kind=SymbolKind.Function,
+                range=LSPRange(
+                    start=LSPPosition(line=0, character=0),
+                    end=LSPPosition(line=1, character=0),
+                ),
+                selection_range=LSPRange(
+                    start=LSPPosition(line=0, character=4),
+                    end=LSPPosition(line=0, character=7),
+                ),
+            )
+        ]
+
+
+def _write(path: Path, content: str, age: float = 10.0) -> None:
+    path.write_text(content)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_symbol_requests_are_coalesced(tmp_path: Path):
+    path = tmp_path / "a.py"
+    path.write_text("def foo(): ...\n")
+    client = SymbolClient()
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(10):
+            tg.start_soon(request_document_symbols, client, path)
+
+    assert client.symbol_calls == 1
+    stats = get_request_stats(client)  # type: ignore
+    assert stats.issued == 1
+    assert stats.coalesced == 9
+
+
+@pytest.mark.asyncio
+async def test_symbol_cache_invalidation(tmp_path: Path):
+    path = tmp_path / "a.py"
+    _write(path, "def foo(): ...\n")
+    client = SymbolClient()
+
+    first = await request_symbol_index(client, path)  # type: ignore
+    assert await request_symbol_index(client, path) is first  # type: ignore
+    assert client.symbol_calls == 1
+    stats = get_symbol_cache(client).stats  # type: ignore
+    assert (stats.hits, stats.misses) == (1, 1)
+
+    # Changed on disk
+    _write(path, "def foo(): return 1\n", age=5.0)
+    await request_symbol_index(client, path)  # type: ignore
+    assert client.symbol_calls == 2
+
+    # Explicitly invalidated, e.g. after a rename was applied
+    invalidate_document(client, path)  # type: ignore
+    await request_symbol_index(client, path)  # type: ignore
+    assert client.symbol_calls == 3
@@ -1,15 +1,25 @@
+import os
+import time
 from collections.abc import Sequence
 from contextlib import asynccontextmanager
 from pathlib import Path
 
+import anyio
 import pytest
-from lsp_client.capability.request import WithRequestWorkspaceSymbol
+from lsp_client.capability.request import (
+    WithRequestDocumentSymbol,
+    WithRequestWorkspaceSymbol,
+)
+from lsp_client.capability.request.workspace_symbol import (
+    WithRequestWorkspaceSymbolResolve,
+)
 from lsp_client.client.document_state import DocumentStateManager
 from lsp_client.protocol import CapabilityClientProtocol
 from lsp_client.protocol.lang import LanguageConfig
 from lsp_client.utils.config import ConfigurationMap
 from lsp_client.utils.workspace import DEFAULT_WORKSPACE_DIR, Workspace, WorkspaceFolder
 from lsprotocol.types import (
+    DocumentSymbol,
     LanguageKind,
     Location,
     LocationUriOnly,
@@ -28,6 +38,8 @@ from lsprotocol.types import (
 from lsap.capability.search import SearchCapability
 from lsap.schema.models import SymbolKind
 from lsap.schema.search import SearchRequest
+from lsap.utils.request import request_workspace_symbol_resolve
+from lsap.utils.search_cache import SearchResultCache, get_search_cache
 
 
 class MockSearchClient(
@@ -291,3 +303,259 @@ async def test_search_resolve():
     assert len(resp.items) == 1
     assert resp.items[0].name == "uri_only_sym"
     assert resp.items[0].line == 11  # 10 + 1
+
+
+@pytest.mark.asyncio
+async def test_search_uses_local_index(tmp_path: Path):
+    class IndexingClient(WithRequestDocumentSymbol, MockSearchClient):
+        def __init__(self):
+            super().__init__()
+            self._workspace = Workspace(
+                {
+                    DEFAULT_WORKSPACE_DIR: WorkspaceFolder(
+                        uri=tmp_path.as_uri(), name=DEFAULT_WORKSPACE_DIR
+                    )
+                }
+            )
+            self.server_queries = 0
+
+        async def request_workspace_symbol_list(self, query, *, resolve=False):
+            self.server_queries += 1
+            return await super().request_workspace_symbol_list(query)
+
+        async def request_document_symbol_list(self, file_path):
+            range = LSPRange(
+                start=LSPPosition(line=0, character=0),
+                end=LSPPosition(line=0, character=1),
+            )
+            return [
+                DocumentSymbol(
+                    name=name,
+                    kind=LSPSymbolKind.Function,
+                    range=range,
+                    selection_range=range,
+                )
+                for name in Path(file_path).read_text().split()
+            ]
+
+        async def request_document_symbol_information_list(self, file_path):
+            return []
+
+    def write(name: str, content: str, age: float) -> None:
+        path = tmp_path / name
+        path.write_text(content)
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+
+    write("a.py", "foo_bar baz", age=20)
+    write("b.py", "food", age=20)
+    client = IndexingClient()
+    capability = SearchCapability(client=client)  # type: ignore
+
+    assert (await capability(SearchRequest(query="foo"))) is not None
+    assert client.server_queries == 1
+
+    await capability.index_workspace()
+    resp = await capability(SearchRequest(query="foo"))
+    assert resp is not None
+    assert [item.name for item in resp.items] == ["food", "foo_bar"]
+    assert resp.items[1].file_path == tmp_path / "a.py"
+    assert client.server_queries == 1
+
+    # Changed files are re-indexed before searching.
+    write("b.py", "bar", age=10)
+    resp = await capability(SearchRequest(query="foo"))
+    assert resp is not None
+    assert [item.name for item in resp.items] == ["foo_bar"]
+    assert client.server_queries == 1
+
+
+@pytest.mark.asyncio
+async def test_search_refines_cached_results():
+    names = ["User", "UserRepo", "UserRepository", "Unrelated"]
+
+    class CountingClient(MockSearchClient):
+        def __init__(self):
+            super().__init__()
+            self.server_queries = 0
+
+        async def request_workspace_symbol_list(self, query, *, resolve=False):
+            self.server_queries += 1
+            return [
+                WorkspaceSymbol(
+                    name=name,
+                    kind=LSPSymbolKind.Class,
+                    location=LocationUriOnly(uri=f"file:///{name}.py"),
+                )
+                for name in names
+                if query.lower() in name.lower()
+            ]
+
+    client = CountingClient()
+    capability = SearchCapability(client=client)  # type: ignore
+
+    for query in ("User", "UserRepo", "userrepository"):
+        resp = await capability(SearchRequest(query=query))
+        assert resp is not None
+    assert [item.name for item in resp.items] == ["UserRepository"]
+    assert client.server_queries == 1
+
+    # Not a refinement of any cached query
+    await capability(SearchRequest(query="Unrelated"))
+    assert client.server_queries == 2
+
+    stats = get_search_cache(client).stats
+    assert (stats.hits, stats.refinements, stats.misses) == (2, 2, 2)
+    assert stats.refinement_rate == 0.5
+
+
+def test_search_cache_skips_possibly_truncated_results():
+    cache = SearchResultCache(max_results=2)
+    symbols = [
+        WorkspaceSymbol(
+            name=f"User{i}",
+            kind=LSPSymbolKind.Class,
+            location=LocationUriOnly(uri="file:///a.py"),
+        )
+        for i in range(2)
+    ]
+    cache.put("User", symbols)
+    assert cache.get("User") == symbols
+    assert cache.get("User1") is None
+
+
+def test_search_cache_only_refines_identifier_queries():
+    cache = SearchResultCache()
+    symbols = [
+        WorkspaceSymbol(
+            name="User",
+            kind=LSPSymbolKind.Class,
+            location=LocationUriOnly(uri="file:///a.py"),
+        )
+    ]
+    cache.put("User", symbols)
+    cache.put("#Us", symbols)
+    for query in ("User.save", "User::save", "#User", "User*"):
+        assert cache.get(query) is None
+    assert cache.get("Users") == []
+
+
+@pytest.mark.asyncio
+async def test_search_resolves_pages_once(tmp_path: Path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"m{i}.py"
+        path.write_text("")
+        mtime = time.time() - 10
+        os.utime(path, (mtime, mtime))
+        paths.append(path)
+
+    class ResolvingClient(WithRequestWorkspaceSymbolResolve, MockSearchClient):
+        def __init__(self):
+            super().__init__()
+            self.resolved: list[str] = []
+
+        async def request_workspace_symbol_list(self, query, *, resolve=False):
+            return [
+                WorkspaceSymbol(
+                    name=path.stem,
+                    kind=LSPSymbolKind.Function,
+                    location=LocationUriOnly(uri=path.as_uri()),
+                    data={"id": path.stem},
+                )
+                for path in paths
+            ]
+
+        async def request_workspace_symbol_resolve(self, symbol):
+            self.resolved.append(symbol.name)
+            return WorkspaceSymbol(
+                name=symbol.name,
+                kind=symbol.kind,
+                location=Location(
+                    uri=symbol.location.uri,
+                    range=LSPRange(
+                        start=LSPPosition(line=3, character=0),
+                        end=LSPPosition(line=3, character=1),
+                    ),
+                ),
+            )
+
+    client = ResolvingClient()
+    capability = SearchCapability(client=client)  # type: ignore
+
+    first = await capability(SearchRequest(query="m", max_items=2))
+    assert first is not None
+    assert [item.line for item in first.items] == [4, 4]
+    # Only the requested page is resolved.
+    assert sorted(client.resolved) == ["m0", "m1"]
+
+    second = await capability(
+        SearchRequest(
+            query="m",
+            max_items=2,
+            start_index=2,
+            pagination_id=first.pagination_id,
+        )
+    )
+    assert second is not None
+    assert [item.name for item in second.items] == ["m2", "m3"]
+    assert sorted(client.resolved) == ["m0", "m1", "m2", "m3"]
+
+    # A new search reuses the symbols resolved before.
+    again = await capability(SearchRequest(query="m", max_items=2))
+    assert again is not None and again.pagination_id != first.pagination_id
+    assert [item.line for item in again.items] == [4, 4]
+    assert len(client.resolved) == 4
+
+
+@pytest.mark.asyncio
+async def test_resolve_tells_same_named_symbols_apart(tmp_path: Path):
+    path = tmp_path / "m.py"
+    path.write_text("")
+    mtime = time.time() - 10
+    os.utime(path, (mtime, mtime))
+
+    class ResolvingClient(WithRequestWorkspaceSymbolResolve, MockSearchClient):
+        def __init__(self):
+            super().__init__()
+            self.resolved = 0
+
+        async def request_workspace_symbol_resolve(self, symbol):
+            self.resolved += 1
+            await anyio.sleep(0.01)
+            line = symbol.data["line"] if symbol.data else 0
+            return WorkspaceSymbol(
+                name=symbol.name,
+                kind=symbol.kind,
+                location=Location(
+                    uri=symbol.location.uri,
+                    range=LSPRange(
+                        start=LSPPosition(line=line, character=0),
+                        end=LSPPosition(line=line, character=1),
+                    ),
+                ),
+            )
+
+    def overload(data):
+        return WorkspaceSymbol(
+            name="f",
+            kind=LSPSymbolKind.Function,
+            location=LocationUriOnly(uri=path.as_uri()),
+            data=data,
+        )
+
+    client = ResolvingClient()
+    results = [None, None, None]
+
+    async def resolve(i, symbol):
+        results[i] = await request_workspace_symbol_resolve(client, symbol)  # type: ignore
+
+    async with anyio.create_task_group() as tg:
+        for i, line in enumerate((1, 5, 1)):
+            tg.start_soon(resolve, i, overload({"line": line}))
+    assert [r.location.range.start.line for r in results] == [1, 5, 1]  # type: ignore
+    assert client.resolved == 2
+
+    await request_workspace_symbol_resolve(client, overload(None))  # type: ignore
+    await request_workspace_symbol_resolve(client, overload(None))  # type: ignore
+    assert client.resolved == 4
@@ -0,0 +1,96 @@
+import anyio
+import pytest
+
+from lsap.capability.outline import OutlineCapability
+from lsap.capability.search import SearchCapability
+from lsap.utils.sem import (
+    AdaptiveLimiter,
+    configure_limiter,
+    get_limiter,
+    set_limiter,
+    with_sem,
+)
+
+
+@pytest.mark.asyncio
+async def test_limiter_bounds_concurrency():
+    limiter = AdaptiveLimiter(floor=1, ceiling=3, initial=3)
+    running = 0
+    peak = 0
+
+    async def work() -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await anyio.sleep(0.01)
+        running -= 1
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(20):
+            tg.start_soon(with_sem(limiter, work))
+
+    assert peak == 3
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_limiter_additive_increase():
+    limiter = AdaptiveLimiter(floor=1, ceiling=8, initial=2)
+    for _ in range(10):
+        async with limiter:
+            pass
+    assert limiter.limit > 2
+    assert limiter.limit <= 8
+
+
+@pytest.mark.asyncio
+async def test_limiter_multiplicative_decrease_on_error():
+    limiter = AdaptiveLimiter(floor=2, ceiling=16, initial=16, backoff=0.5)
+
+    with pytest.raises(RuntimeError):
+        async with limiter:
+            raise RuntimeError("server error")
+    assert limiter.limit == 8
+
+    # Consecutive failures within one latency window only back off once
+    with pytest.raises(RuntimeError):
+        async with limiter:
+            raise RuntimeError("server error")
+    assert limiter.limit == 8
+
+
+@pytest.mark.asyncio
+async def test_limiter_decrease_on_slow_slot():
+    limiter = AdaptiveLimiter(
+        floor=2, ceiling=16, initial=10, backoff=0.5, latency_target=0.01
+    )
+    async with limiter:
+        await anyio.sleep(0.05)
+    assert limiter.limit == 5
+
+    for _ in range(5):
+        await anyio.sleep(0.02)
+        async with limiter:
+            await anyio.sleep(0.05)
+    assert limiter.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_capabilities_use_the_configured_limiter():
+    class Client:
+        pass
+
+    client = Client()
+    capability = OutlineCapability(client=client)  # type: ignore
+    default = capability.limiter
+    assert (default.floor, default.ceiling) == (4, 64)
+
+    limiter = configure_limiter(client, floor=1, ceiling=2)  # type: ignore
+    assert (limiter.floor, limiter.ceiling, limiter.limit) == (1, 2, 2)
+    assert capability.limiter is limiter
+    assert SearchCapability(client=client).limiter is limiter  # type: ignore
+    assert get_limiter(Client()) is not limiter  # type: ignore
+
+    custom = AdaptiveLimiter(initial=5)
+    set_limiter(client, custom)  # type: ignore
+    assert capability.limiter is custom
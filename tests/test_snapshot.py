@@ -0,0 +1,237 @@
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import pytest
+from lsp_client.client.document_state import DocumentStateManager
+from lsp_client.protocol import CapabilityClientProtocol, GeneralCapabilityProtocol
+from lsp_client.protocol.lang import LanguageConfig
+from lsp_client.utils.config import ConfigurationMap
+from lsprotocol.types import (
+    GeneralClientCapabilities,
+    LanguageKind,
+    Position,
+    PositionEncodingKind,
+    Range,
+    TextEdit,
+)
+
+from lsap.utils import snapshot
+from lsap.utils.cache import SizedLRUCache
+from lsap.utils.document import DocumentReader
+from lsap.utils.mapped import MappedDocumentReader
+from lsap.utils.snapshot import DocumentCache, get_document_cache, read_document
+
+
+class FileClient(CapabilityClientProtocol):
+    def __init__(self):
+        self.reads = 0
+        self._doc_state = DocumentStateManager()
+        self._config_map = ConfigurationMap()
+
+    def as_uri(self, file_path) -> str:
+        return Path(file_path).absolute().as_uri()
+
+    def from_uri(self, uri: str, *, relative: bool = True) -> Path:
+        return Path(uri.removeprefix("file://"))
+
+    def get_workspace(self):
+        return {}
+
+    def get_config_map(self) -> ConfigurationMap:
+        return self._config_map
+
+    def get_document_state(self) -> DocumentStateManager:
+        return self._doc_state
+
+    @classmethod
+    def get_language_config(cls):
+        return LanguageConfig(
+            kind=LanguageKind.Python,
+            suffixes=["py"],
+            project_files=["pyproject.toml"],
+        )
+
+    async def request(self, req, schema):
+        return None
+
+    async def notify(self, msg):
+        pass
+
+    async def write_file(self, uri: str, content: str) -> None:
+        pass
+
+    @asynccontextmanager
+    async def open_files(self, *file_paths):
+        yield
+
+    async def read_file(self, file_path) -> str:
+        self.reads += 1
+        uri = self.as_uri(file_path)
+        if (content := self._doc_state.get_content(uri)) is not None:
+            return content
+        return Path(file_path).read_text()
+
+
+def _write(path: Path, content: str, age: float = 10.0) -> None:
+    path.write_text(content)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.mark.asyncio
+async def test_read_document_reuses_snapshot(tmp_path: Path):
+    path = tmp_path / "a.py"
+    _write(path, "a = 1\n")
+    client = FileClient()
+
+    first = await read_document(client, path)  # type: ignore
+    second = await read_document(client, path)  # type: ignore
+    assert first is second
+    assert client.reads == 1
+    assert get_document_cache(client).stats.hits == 1  # type: ignore
+
+    _write(path, "a = 12\n", age=5.0)
+    third = await read_document(client, path)  # type: ignore
+    assert third is not first
+    assert third.document == "a = 12\n"
+    assert client.reads == 2
+
+
+@pytest.mark.asyncio
+async def test_read_document_skips_recently_modified(tmp_path: Path):
+    path = tmp_path / "a.py"
+    path.write_text("a = 1\n")
+    client = FileClient()
+
+    await read_document(client, path)  # type: ignore
+    await read_document(client, path)  # type: ignore
+    assert client.reads == 2
+
+
+@pytest.mark.asyncio
+async def test_read_document_tracks_open_document_version(tmp_path: Path):
+    path = tmp_path / "a.py"
+    _write(path, "a = 1\n")
+    client = FileClient()
+    uri = client.as_uri(path)
+    client.get_document_state().register(uri, "a = 1\n")
+
+    first = await read_document(client, path)  # type: ignore
+    assert await read_document(client, path) is first  # type: ignore
+
+    client.get_document_state().update_content(uri, "a = 2\n")
+    second = await read_document(client, path)  # type: ignore
+    assert second.document == "a = 2\n"
+
+
+@pytest.mark.asyncio
+async def test_read_document_uses_client_position_encoding(tmp_path: Path):
+    class Utf8Client(FileClient, GeneralCapabilityProtocol):
+        @classmethod
+        def iter_methods(cls):
+            yield from ()
+
+        @classmethod
+        def check_server_capability(cls, cap):
+            pass
+
+        @classmethod
+        def register_general_capability(cls, cap: GeneralClientCapabilities):
+            cap.position_encodings = [PositionEncodingKind.Utf8]
+
+    path = tmp_path / "a.py"
+    _write(path, "é = 1\n")
+
+    reader = await read_document(FileClient(), path)  # type: ignore
+    assert reader.encoding == PositionEncodingKind.Utf16
+    reader = await read_document(Utf8Client(), path)  # type: ignore
+    assert reader.encoding == PositionEncodingKind.Utf8
+    assert reader.to_column(Position(line=0, character=2)) == 1
+
+
+@pytest.mark.asyncio
+async def test_read_document_maps_large_files(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(snapshot, "MAPPED_MIN_SIZE", 16)
+    small, large = tmp_path / "small.py", tmp_path / "large.py"
+    _write(small, "a = 1\n")
+    _write(large, "a = 1\n" * 10)
+    client = FileClient()
+
+    assert type(await read_document(client, small)) is DocumentReader  # type: ignore
+    reader = await read_document(client, large)  # type: ignore
+    assert isinstance(reader, MappedDocumentReader)
+    assert client.reads == 1
+    assert await read_document(client, large) is reader  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_mapped_documents_are_sized_by_their_line_index(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(snapshot, "MAPPED_MIN_SIZE", 16)
+    path = tmp_path / "large.py"
+    _write(path, "value = 'a line of forty characters...'\n" * 100)
+    cache = DocumentCache(max_size=2000)
+    client = FileClient()
+
+    reader = await cache.read(client, path)  # type: ignore
+    assert isinstance(reader, MappedDocumentReader)
+    # 101 line starts of 8 bytes, rather than the 4000 bytes of the file.
+    assert reader.size == 808
+    assert await cache.read(client, path) is reader  # type: ignore
+    assert cache.stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_update_keeps_snapshot_warm(tmp_path: Path):
+    path = tmp_path / "a.py"
+    _write(path, "a = 1\nb = a\n")
+    client = FileClient()
+    reader = await read_document(client, path)  # type: ignore
+
+    edits = [
+        TextEdit(
+            range=Range(
+                start=Position(line=line, character=col),
+                end=Position(line=line, character=col + 1),
+            ),
+            new_text="value",
+        )
+        for line, col in ((0, 0), (1, 4))
+    ]
+    _write(path, "value = 1\nb = value\n")
+    get_document_cache(client).update(client, path, edits)  # type: ignore
+
+    # Readers already handed out are not patched under their holders.
+    assert reader.document == "a = 1\nb = a\n"
+    assert reader.get_line(1) == "b = a"
+    patched = await read_document(client, path)  # type: ignore
+    assert patched is not reader
+    assert patched.document == "value = 1\nb = value\n"
+    assert client.reads == 1
+
+    # The edits do not match what was written: the snapshot is dropped.
+    _write(path, "something else\n")
+    get_document_cache(client).update(client, path, edits[:1])  # type: ignore
+    assert patched.document == "value = 1\nb = value\n"
+    assert (await read_document(client, path)).document == "something else\n"  # type: ignore
+
+
+def test_sized_lru_cache_evicts_by_size():
+    cache: SizedLRUCache[str, str] = SizedLRUCache(max_size=10, sizeof=len)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"
+    cache.put("c", "cccc")
+    # "b" is the least recently used entry
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.size == 8
+
+    cache.put("big", "x" * 11)
+    assert cache.get("big") is None
+    assert cache.size == 8
@@ -0,0 +1,97 @@
+import random
+
+from lsprotocol.types import DocumentSymbol, SymbolKind
+from lsprotocol.types import Position as LSPPosition
+from lsprotocol.types import Range as LSPRange
+
+from lsap.utils.symbol import SymbolIndex, symbol_at
+
+
+def _symbol(name, start, end, children=None):
+    return DocumentSymbol(
+        name=name,
+        kind=SymbolKind.Function,
+        range=LSPRange(
+            start=LSPPosition(line=start[0], character=start[1]),
+            end=LSPPosition(line=end[0], character=end[1]),
+        ),
+        selection_range=LSPRange(
+            start=LSPPosition(line=start[0], character=start[1]),
+            end=LSPPosition(line=start[0], character=start[1]),
+        ),
+        children=children,
+    )
+
+
+def _random_tree(rng, start, end, depth, prefix):
+    symbols = []
+    line = start
+    while line < end and len(symbols) < 4:
+        length = rng.randint(1, max(1, (end - line) // 2))
+        sym_end = min(end, line + length)
+        children = (
+            _random_tree(rng, line + 1, sym_end, depth - 1, f"{prefix}{len(symbols)}.")
+            if depth > 0
+            else None
+        )
+        symbols.append(
+            _symbol(f"{prefix}{len(symbols)}", (line, 0), (sym_end, 0), children)
+        )
+        line = sym_end + rng.randint(0, 2)
+    return symbols
+
+
+def test_symbol_index_matches_linear_scan():
+    rng = random.Random(0)
+    for _ in range(20):
+        symbols = _random_tree(rng, 0, 200, 4, "s")
+        index = SymbolIndex(symbols)
+        for line in range(0, 205):
+            pos = LSPPosition(line=line, character=rng.randint(0, 10))
+            assert index.symbol_at(pos) == symbol_at(symbols, pos)
+
+
+def test_symbol_index_innermost():
+    inner = _symbol("inner", (2, 4), (4, 0))
+    outer = _symbol("outer", (0, 0), (10, 0), [inner])
+    index = SymbolIndex([outer, _symbol("other", (12, 0), (14, 0))])
+
+    assert index.symbol_at(LSPPosition(line=3, character=0)) == (
+        ["outer", "inner"],
+        inner,
+    )
+    assert index.symbol_at(LSPPosition(line=5, character=0)) == (["outer"], outer)
+    assert index.symbol_at(LSPPosition(line=11, character=0)) is None
+    assert SymbolIndex([]).symbol_at(LSPPosition(line=0, character=0)) is None
+
+
+def test_symbol_index_overlapping_siblings():
+    a = _symbol("a", (0, 0), (5, 0))
+    b = _symbol("b", (3, 0), (8, 0))
+    index = SymbolIndex([a, b])
+    for line in range(10):
+        pos = LSPPosition(line=line, character=0)
+        assert index.symbol_at(pos) == symbol_at([a, b], pos)
+
+    s0 = _symbol("s0", (0, 2), (0, 5))
+    s1 = _symbol("s1", (0, 3), (0, 5))
+    s2 = _symbol("s2", (0, 3), (0, 9))
+    index = SymbolIndex([s0, s1, s2])
+    for character in range(10):
+        pos = LSPPosition(line=0, character=character)
+        assert index.symbol_at(pos) == symbol_at([s0, s1, s2], pos)
+    assert index.symbol_at(LSPPosition(line=0, character=3)) == (["s1"], s1)
+
+
+def test_symbol_index_find_by_path():
+    first = _symbol("overload", (1, 0), (2, 0))
+    second = _symbol("overload", (3, 0), (4, 0))
+    cls = _symbol("A", (0, 0), (5, 0), [first, second])
+    index = SymbolIndex([cls])
+
+    assert index.find(["A"]) == [(["A"], cls)]
+    assert index.find(["A", "overload"]) == [
+        (["A", "overload"], first),
+        (["A", "overload"], second),
+    ]
+    assert index.find(["overload"]) == []
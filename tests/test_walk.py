@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import pytest
+
+from lsap.utils.walk import FileWalker, IgnoreRule, walk_files
+
+
+def _touch(root: Path, *paths: str) -> None:
+    for rel in paths:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+
+def _rel(root: Path, paths: list[Path]) -> list[str]:
+    return [p.relative_to(root).as_posix() for p in paths]
+
+
+@pytest.mark.parametrize(
+    ("pattern", "path", "is_dir", "ignored"),
+    [
+        ("*.log", "a/b/x.log", False, True),
+        ("/build", "build", True, True),
+        ("/build", "src/build", True, False),
+        ("docs/", "docs", False, False),
+        ("docs/", "a/docs", True, True),
+        ("a/**/z.py", "a/z.py", False, True),
+        ("a/**/z.py", "a/b/c/z.py", False, True),
+        ("**/gen", "x/gen", True, True),
+        ("lib/**", "lib/x/y.py", False, True),
+        ("file?.py", "file1.py", False, True),
+        ("file[!0-9].py", "file1.py", False, False),
+        (r"\#hash", "#hash", False, True),
+    ],
+)
+def test_ignore_rule(pattern, path, is_dir, ignored):
+    rule = IgnoreRule.parse(pattern)
+    assert rule is not None
+    matched = bool(rule.regex.match(path)) and (is_dir or not rule.dir_only)
+    assert matched is ignored
+
+
+def test_comments_and_blank_lines_are_skipped():
+    assert IgnoreRule.parse("# comment") is None
+    assert IgnoreRule.parse("   ") is None
+
+
+def test_walk_honors_excludes_and_ignore_files(tmp_path: Path):
+    _touch(
+        tmp_path,
+        "main.py",
+        "stub.pyi",
+        "notes.txt",
+        "node_modules/dep/index.py",
+        ".venv/lib/site.py",
+        "src/app.py",
+        "src/generated/out.py",
+        "src/generated/keep.py",
+        "src/tmp_scratch.py",
+        "pkg/mod.py",
+        "pkg/deep/inner.py",
+    )
+    (tmp_path / ".gitignore").write_text("tmp_*.py\n/pkg/deep/\n")
+    (tmp_path / "src" / ".ignore").write_text("generated/*\n!generated/keep.py\n")
+
+    files = FileWalker((".py", ".pyi")).walk(tmp_path)
+    assert _rel(tmp_path, files) == [
+        "main.py",
+        "pkg/mod.py",
+        "src/app.py",
+        "src/generated/keep.py",
+        "stub.pyi",
+    ]
+
+    assert _rel(tmp_path, walk_files(tmp_path, [".py"], recursive=False)) == ["main.py"]
+    assert "node_modules/dep/index.py" in _rel(
+        tmp_path, walk_files(tmp_path, [".py"], exclude=())
+    )
+
+
+def test_walk_honors_ignore_files_above_the_root(tmp_path: Path):
+    repo = tmp_path / "repo"
+    _touch(
+        repo,
+        "src/a.py",
+        "src/generated/b.py",
+        "pkg/mod.py",
+        "pkg/deep/inner.py",
+    )
+    (repo / ".git").mkdir()
+    (repo / ".gitignore").write_text("generated/\n/pkg/deep/\n")
+    (repo / "pkg" / ".ignore").write_text("mod.py\n")
+    # Above the repository root: not applied.
+    (tmp_path / ".gitignore").write_text("a.py\n")
+
+    assert _rel(repo / "src", FileWalker((".py",)).walk(repo / "src")) == ["a.py"]
+    assert _rel(repo / "pkg", FileWalker((".py",)).walk(repo / "pkg")) == []
+    # An explicitly given root is walked even if it is ignored itself.
+    deep = repo / "pkg" / "deep"
+    assert _rel(deep, FileWalker((".py",)).walk(deep)) == ["inner.py"]
+    assert _rel(
+        repo, FileWalker((".py",), use_ignore_files=False).walk(repo / "src")
+    ) == ["src/a.py", "src/generated/b.py"]
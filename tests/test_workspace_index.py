@@ -0,0 +1,123 @@
+import os
+import time
+from pathlib import Path
+
+from lsp_client.client.document_state import DocumentStateManager
+from lsprotocol.types import DocumentSymbol, Position, Range
+from lsprotocol.types import SymbolKind as LSPSymbolKind
+
+from lsap.schema.models import SymbolKind
+from lsap.utils.workspace_index import WorkspaceSymbolIndex, fuzzy_pattern
+
+
+def _symbol(name, kind, line, children=None):
+    range = Range(
+        start=Position(line=line, character=0), end=Position(line=line, character=1)
+    )
+    return DocumentSymbol(
+        name=name, kind=kind, range=range, selection_range=range, children=children
+    )
+
+
+def _names(symbols):
+    return [s.name for s in symbols]
+
+
+def test_search_ranks_exact_prefix_substring_subsequence():
+    index = WorkspaceSymbolIndex()
+    index.update(
+        Path("/ws/a.py"),
+        None,
+        [
+            _symbol("get_config_value", LSPSymbolKind.Function, 0),
+            _symbol("Config", LSPSymbolKind.Class, 1),
+            _symbol("ConfigLoader", LSPSymbolKind.Class, 2),
+            _symbol("unrelated", LSPSymbolKind.Variable, 3),
+        ],
+    )
+    index.update(
+        Path("/ws/b.py"),
+        None,
+        [
+            _symbol(
+                "Base",
+                LSPSymbolKind.Class,
+                0,
+                [_symbol("config", LSPSymbolKind.Method, 1)],
+            )
+        ],
+    )
+
+    assert _names(index.search("config")) == [
+        "Config",
+        "config",
+        "ConfigLoader",
+        "get_config_value",
+    ]
+    assert _names(index.search("gcv")) == ["get_config_value"]
+    assert _names(index.search("config", [SymbolKind.Method])) == ["config"]
+    method = index.search("config", [SymbolKind.Method])[0]
+    assert method.container_name == "Base"
+    assert method.location.uri == Path("/ws/b.py").as_uri()
+
+
+def test_update_and_remove_replace_file_symbols():
+    index = WorkspaceSymbolIndex()
+    path = Path("/ws/a.py")
+    index.update(path, None, [_symbol("OldName", LSPSymbolKind.Class, 0)])
+    index.update(path, None, [_symbol("NewName", LSPSymbolKind.Class, 0)])
+
+    assert _names(index.search("name")) == ["NewName"]
+    assert index.search("old") == []
+
+    index.remove(path)
+    assert len(index) == 0
+    assert index.search("name") == []
+
+
+def test_search_matches_a_full_scan():
+    names = [
+        "get_config",
+        "GetConfig",
+        "config",
+        "cfg",
+        "gc",
+        "a",
+        "abc",
+        "cab",
+        "xyz_abc_1",
+        "ünïcode",
+    ]
+    index = WorkspaceSymbolIndex()
+    index.update(
+        Path("/ws/a.py"),
+        None,
+        [_symbol(name, LSPSymbolKind.Function, i) for i, name in enumerate(names)],
+    )
+    for query in ("", "a", "c", "gc", "abc", "gcfg", "CONF", "ün", "zz", "b1"):
+        expected = {n for n in names if fuzzy_pattern(query).search(n.lower())}
+        assert set(_names(index.search(query))) == expected, query
+
+
+def test_stale_checks_given_files_or_all_of_them(tmp_path: Path):
+    class Client:
+        def get_document_state(self):
+            return DocumentStateManager()
+
+    index = WorkspaceSymbolIndex(check_interval=60)
+    a, b = tmp_path / "a.py", tmp_path / "b.py"
+    for path in (a, b):
+        path.write_text("")
+        mtime = time.time() - 20
+        os.utime(path, (mtime, mtime))
+        index.update(path, ("stat", path.stat().st_mtime_ns, 0), [])
+    client = Client()
+
+    assert index.check_due
+    assert index.stale(client) == []  # type: ignore
+    assert not index.check_due
+
+    b.write_text("changed")
+    os.utime(b, (time.time() - 10, time.time() - 10))
+    assert index.stale(client, [a]) == []  # type: ignore
+    assert index.stale(client, [a, b, tmp_path / "unknown.py"]) == [b]  # type: ignore